@@ -1,22 +1,29 @@
 import geopandas as gpd
+import pyogrio
+
+from _coast_utils import flatten_polygons, load_coast
+import numpy as np
+import shapely
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from shapely.geometry import Polygon, MultiPolygon, GeometryCollection
 from shapely.ops import unary_union
 
 # Read the shapefile ===
-coast_path = "coastlines_2-2-0.shp/coastlines_2-2-0_shorelines_annual.shp"
-gdf = gpd.read_file(coast_path)
+# load_coast pushes the year filter down to pyogrio on the first run and
+# caches the 2023 subset as GeoParquet for every other script in this folder
+gdf = load_coast()
 
-# Filter to year = 2023 ===
-# (Assuming the field is named "year" and is stored as string or integer)
-gdf = gdf[gdf["year"] == 2023]
 
 # === 3. Confirm projected CRS (should be EPSG:3577)
 print("CRS:", gdf.crs)  # Should say GDA94 / Australia Albers (EPSG:3577)
 
 # Separate main coastline from islands by length (tweak this threshold if needed)
-gdf["length_m"] = gdf.geometry.length
-main_coast = gdf[gdf["length_m"] > 100000]     # lines > 100 km = mainland coast
-islands = gdf[gdf["length_m"] <= 100000]       # smaller lines = islands
+# One C pass over the coordinates; no need to materialize a length_m column
+lengths = shapely.length(np.asarray(gdf.geometry.values))
+main_mask = lengths > 100000
+main_coast = gdf.iloc[main_mask]     # lines > 100 km = mainland coast
+islands = gdf.iloc[~main_mask]       # smaller lines = islands
 
 # Flatten all lines into single LineStrings before buffering
 def explode_lines(geom):
@@ -32,42 +39,49 @@ print(main_coast.geometry.geom_type.value_counts())
 # Apply this before buffering
 main_lines = main_coast.geometry.explode(index_parts=False).reset_index(drop=True)
 
-# Buffer main coast asymmetrically
-landward = main_lines.apply(lambda geom: geom.parallel_offset(2000, side='left', join_style=2).buffer(1))
-oceanward = main_lines.apply(lambda geom: geom.parallel_offset(500, side='right', join_style=2).buffer(1))
+# Buffer main coast asymmetrically - vectorized over the whole line array
+# (offset_curve with a positive distance offsets left, negative offsets right).
+# The 1m buffer only exists to turn offset lines into thin polygons, so merge
+# each side's lines first and run that arc generation once per side instead of
+# once per line.
+main_arr = np.asarray(main_lines.values)
+landward_lines = shapely.offset_curve(main_arr, 2000, join_style="mitre")
+oceanward_lines = shapely.offset_curve(main_arr, -500, join_style="mitre")
+landward = shapely.get_parts(shapely.buffer(shapely.unary_union(landward_lines), 1))
+oceanward = shapely.get_parts(shapely.buffer(shapely.unary_union(oceanward_lines), 1))
 
 # Buffer islands symmetrically
 island_buffers = islands.buffer(500)
 
-# Combine everything
-all_buffers = list(landward) + list(oceanward) + list(island_buffers)
+# Combine everything - numpy concatenation, no intermediate Python lists
+all_buffers = np.concatenate([landward, oceanward, np.asarray(island_buffers.values)])
 
-# Filter to only valid polygons
-polygon_geoms = [geom for geom in all_buffers if isinstance(geom, (Polygon, MultiPolygon))]
+# Keep only non-empty polygons: get_type_id reads the GEOS type tag in one
+# C pass (3 = Polygon, 6 = MultiPolygon), far cheaper than N isinstance checks
+type_ids = shapely.get_type_id(all_buffers)
+all_buffers = all_buffers[((type_ids == 3) | (type_ids == 6)) & ~shapely.is_empty(all_buffers)]
 
 print("Total input geometries:", len(all_buffers))
-print("Geometry types in all_buffers:")
-print([geom.geom_type for geom in all_buffers[:10]])  # preview first 10
 
-# STEP 1: Union everything (this might be a GeometryCollection)
-combined_raw = unary_union(all_buffers)
+# STEP 1: Union everything - but most buffers don't touch, so group spatially
+# adjacent buffers with an STRtree first and only union within each connected
+# component. Disjoint components need no further union.
+all_buffers_arr = np.asarray(all_buffers, dtype=object)
+tree = shapely.STRtree(all_buffers_arr)
+i_idx, j_idx = tree.query(all_buffers_arr, predicate="intersects")
+
+n = len(all_buffers_arr)
+graph = coo_matrix((np.ones(len(i_idx)), (i_idx, j_idx)), shape=(n, n))
+n_components, labels = connected_components(graph, directed=False)
+print(f"Grouped {n} buffers into {n_components} connected components")
+
+combined_raw = [unary_union(all_buffers_arr[labels == k]) for k in range(n_components)]
 
-print("Type of combined_raw:", type(combined_raw))
-print("Is combined_raw empty?:", combined_raw.is_empty)
+print("Number of disjoint unioned groups:", len(combined_raw))
 
 # STEP 2: Flatten everything into individual geometries
-# This handles Polygon, MultiPolygon, GeometryCollection, etc.
-flattened = []
-if isinstance(combined_raw, (Polygon, MultiPolygon)):
-    flattened.append(combined_raw)
-elif isinstance(combined_raw, GeometryCollection):
-    flattened.extend([g for g in combined_raw.geoms if isinstance(g, (Polygon, MultiPolygon))])
-elif hasattr(combined_raw, '__iter__'):
-    for g in combined_raw:
-        if isinstance(g, (Polygon, MultiPolygon)):
-            flattened.append(g)
-        elif isinstance(g, GeometryCollection):
-            flattened.extend([geom for geom in g.geoms if isinstance(geom, (Polygon, MultiPolygon))])
+# (handles Polygon, MultiPolygon, GeometryCollection in one C call)
+flattened = flatten_polygons(combined_raw)
 
 print(f"Number of flattened geometries: {len(flattened)}")
 print("Flattened geometry types:", [g.geom_type for g in flattened])
@@ -76,5 +90,6 @@ print("Flattened geometry types:", [g.geom_type for g in flattened])
 gdf_out = gpd.GeoDataFrame(geometry=flattened, crs=gdf.crs)
 print("Geometry types in final output:", gdf_out.geometry.geom_type.unique())
 
-# STEP 4: Save to shapefile
-gdf_out.to_file("coast_buffer.shp")
\ No newline at end of file
+# STEP 4: Save to GeoPackage (single SQLite transaction - much faster than
+# shapefile sidecar writes, and no 2GB / field-name limits)
+pyogrio.write_dataframe(gdf_out, "coast_buffer.gpkg", driver="GPKG", use_arrow=True)
\ No newline at end of file
@@ -11,6 +11,7 @@ coastline_buffer = "Aus_coastline"  # Your coastline buffer layer
 output_workspace = r"E:\AusCoastline"  # Where to save results
 cell_size = "10"  # Final fishnet cell size in meters
 tile_size = 5000  # 5km tiles in meters
+max_row_tiles = 200  # max tiles batched into one row fishnet call
 
 # Create output folder if it doesn't exist
 if not os.path.exists(output_workspace):
@@ -59,14 +60,11 @@ def create_processing_tiles(coastline_layer, tile_size_m):
         tiles_clipped = "processing_tiles_clipped"
         arcpy.analysis.Clip(tiles_fishnet, coastline_layer, tiles_clipped)
         
-        # Add tile ID field
+        # Add tile ID field and populate it from the ObjectID in one bulk
+        # UPDATE inside the geodatabase engine, instead of committing a
+        # per-row edit through an UpdateCursor
         arcpy.management.AddField(tiles_clipped, "TILE_ID", "LONG")
-        
-        # Populate tile ID
-        with arcpy.da.UpdateCursor(tiles_clipped, ["TILE_ID", "OID@"]) as cursor:
-            for row in cursor:
-                row[0] = row[1]  # Use ObjectID as tile ID
-                cursor.updateRow(row)
+        arcpy.management.CalculateField(tiles_clipped, "TILE_ID", "!OBJECTID!", "PYTHON3")
         
         # Clean up temporary layer
         arcpy.management.Delete(tiles_fishnet)
@@ -82,60 +80,79 @@ def create_processing_tiles(coastline_layer, tile_size_m):
         print(f"Error creating tiles: {str(e)}")
         return None, 0
 
-def process_tile(tile_id, tiles_layer, coastline_layer):
-    """Process a single tile"""
+def get_tile_rows(tiles_layer, tile_ids):
+    """Group tile IDs into grid rows, each row sorted west-to-east.
+
+    CreateFishnet has a fixed per-call cost (workspace scan + schema
+    validation), so batching a whole row of tiles into one fishnet call
+    amortises that overhead across up to max_row_tiles tiles.
+    """
+    wanted = set(tile_ids)
+    rows = {}
+    with arcpy.da.SearchCursor(tiles_layer, ["TILE_ID", "SHAPE@XY"]) as cursor:
+        for tile_id, (x, y) in cursor:
+            if tile_id in wanted:
+                row_key = int(y // tile_size)
+                rows.setdefault(row_key, []).append((x, tile_id))
+
+    row_batches = []
+    for row_key in sorted(rows):
+        ordered = [tile_id for x, tile_id in sorted(rows[row_key])]
+        for i in range(0, len(ordered), max_row_tiles):
+            row_batches.append((row_key, ordered[i:i + max_row_tiles]))
+    return row_batches
+
+def process_tile_row(row_key, row_tile_ids, tiles_layer, coastline_layer):
+    """Process one grid row of tiles with a single fishnet + clip"""
     try:
-        print(f"Processing tile {tile_id}...")
-        
-        # Step 1: Select the current tile
-        tile_layer = "tile_selected"
-        arcpy.management.MakeFeatureLayer(tiles_layer, tile_layer, 
-                                        f"TILE_ID = {tile_id}")
-        
-        # Check if tile exists
-        result = arcpy.management.GetCount(tile_layer)
-        count = int(result[0])
-        
-        if count == 0:
-            print(f"  - Tile {tile_id} not found, skipping...")
-            return False
-        
-        # Step 2: Clip coastline to this tile - BACK TO GEODATABASE
-        coastline_clipped = f"Coastline_Tile_{tile_id}"
-        arcpy.analysis.Clip(coastline_layer, tile_layer, coastline_clipped)
-        
+        print(f"Processing row {row_key} ({len(row_tile_ids)} tiles)...")
+
+        # Step 1: Select all tiles in this row at once
+        row_layer = "row_selected"
+        id_list = ", ".join(str(tid) for tid in row_tile_ids)
+        arcpy.management.MakeFeatureLayer(tiles_layer, row_layer,
+                                        f"TILE_ID IN ({id_list})")
+
+        # Step 2: Clip coastline to the whole row in one call
+        coastline_clipped = f"Coastline_Row_{row_key}_{row_tile_ids[0]}"
+        arcpy.analysis.PairwiseClip(coastline_layer, row_layer, coastline_clipped)
+
         # Check if clipped coastline has features
         result = arcpy.management.GetCount(coastline_clipped)
         count = int(result[0])
-        
+
         if count == 0:
-            print(f"  - No coastline found in tile {tile_id}, skipping...")
+            print(f"  - No coastline found in row {row_key}, skipping...")
             arcpy.management.Delete(coastline_clipped)
-            return False
-        
-        # Step 3: Get extent of clipped coastline
+            return 0
+
+        # Step 3: Get extent of clipped coastline; skip degenerate extents
         desc = arcpy.Describe(coastline_clipped)
         extent = desc.extent
-        
-        # Step 4: Create fishnet for this tile - BACK TO GEODATABASE
-        fishnet_output = f"Fishnet_Tile_{tile_id}"
+        if extent.XMax - extent.XMin <= 0 or extent.YMax - extent.YMin <= 0:
+            print(f"  - Empty extent for row {row_key}, skipping...")
+            arcpy.management.Delete(coastline_clipped)
+            return 0
+
+        # Step 4: One fishnet spanning the row's combined extent
+        fishnet_output = f"Fishnet_Row_{row_key}_{row_tile_ids[0]}"
         origin_coord = f"{extent.XMin} {extent.YMin}"
         y_axis_coord = f"{extent.XMin} {extent.YMax}"
-        
+
         # Calculate number of rows and columns based on extent and cell size
         cell_size_num = float(cell_size)
         num_cols = int((extent.XMax - extent.XMin) / cell_size_num) + 1
         num_rows = int((extent.YMax - extent.YMin) / cell_size_num) + 1
-        
-        # Safety check for too many cells
+
+        # Safety check for too many cells (scaled to the number of tiles batched)
         total_cells = num_cols * num_rows
-        if total_cells > 1000000:  # 1 million cell safety limit
-            print(f"  - Warning: Tile {tile_id} would create {total_cells:,} cells, skipping...")
+        if total_cells > 1000000 * len(row_tile_ids):
+            print(f"  - Warning: Row {row_key} would create {total_cells:,} cells, skipping...")
             arcpy.management.Delete(coastline_clipped)
-            return False
-        
+            return 0
+
         print(f"  - Creating fishnet with {total_cells:,} cells...")
-        
+
         # Create the fishnet with 10m cells
         arcpy.management.CreateFishnet(
             out_feature_class=fishnet_output,
@@ -150,25 +167,26 @@ def process_tile(tile_id, tiles_layer, coastline_layer):
             template=coastline_clipped,
             geometry_type="POLYGON"
         )
-        
-        # Step 5: Clip fishnet to actual coastline shape - BACK TO GEODATABASE
-        fishnet_clipped = f"Fishnet_Clipped_Tile_{tile_id}"
-        arcpy.analysis.Clip(fishnet_output, coastline_clipped, fishnet_clipped)
-        
-        # Add tile ID to the fishnet for tracking
-        arcpy.management.AddField(fishnet_clipped, "TILE_ID", "LONG")
-        arcpy.management.CalculateField(fishnet_clipped, "TILE_ID", tile_id)
-        
+
+        # Step 5: Clip fishnet to actual coastline shape, then intersect with
+        # the row's tiles so every cell carries its TILE_ID
+        fishnet_coast = f"Fishnet_Coast_Row_{row_key}_{row_tile_ids[0]}"
+        arcpy.analysis.PairwiseClip(fishnet_output, coastline_clipped, fishnet_coast)
+
+        fishnet_clipped = f"Fishnet_Clipped_Row_{row_key}_{row_tile_ids[0]}"
+        arcpy.analysis.PairwiseIntersect([fishnet_coast, row_layer], fishnet_clipped)
+
         # Clean up intermediate files
         arcpy.management.Delete(coastline_clipped)
         arcpy.management.Delete(fishnet_output)
-        
-        print(f"  - Successfully processed tile {tile_id}")
-        return True
-        
+        arcpy.management.Delete(fishnet_coast)
+
+        print(f"  - Successfully processed row {row_key}")
+        return len(row_tile_ids)
+
     except Exception as e:
-        print(f"  - Error processing tile {tile_id}: {str(e)}")
-        return False
+        print(f"  - Error processing row {row_key}: {str(e)}")
+        return 0
 
 def main():
     """Main processing function"""
@@ -210,17 +228,19 @@ def main():
     remaining_tiles = [tid for tid in tile_ids if tid not in processed_tiles]
     print(f"Remaining tiles to process: {len(remaining_tiles)}")
     
-    for i, tile_id in enumerate(remaining_tiles, 1):
-        print(f"\n[{i}/{len(remaining_tiles)}] Processing tile {tile_id}")
-        
-        result = process_tile(tile_id, tiles_layer, coastline_buffer)
-        if result:
-            successful += 1
-        elif result is False:
-            failed += 1
+    # Batch tiles into grid rows so each CreateFishnet/Clip call covers many tiles
+    row_batches = get_tile_rows(tiles_layer, remaining_tiles)
+    print(f"Batched {len(remaining_tiles)} tiles into {len(row_batches)} row groups")
+
+    for i, (row_key, row_tile_ids) in enumerate(row_batches, 1):
+        print(f"\n[{i}/{len(row_batches)}] Processing row {row_key}")
+
+        n_done = process_tile_row(row_key, row_tile_ids, tiles_layer, coastline_buffer)
+        if n_done:
+            successful += n_done
         else:
-            skipped += 1
-    
+            failed += len(row_tile_ids)
+
     print("\n" + "="*50)
     print("PROCESSING COMPLETE")
     print(f"Successful: {successful}")
@@ -234,14 +254,14 @@ def main():
         try:
             # Find all fishnet outputs in current geodatabase
             arcpy.env.workspace = output_workspace
-            current_fishnets = arcpy.ListFeatureClasses("Fishnet_Clipped_Tile_*")
+            current_fishnets = arcpy.ListFeatureClasses("Fishnet_Clipped_*")
             
             # Also check external drive for existing tiles
             external_gdb = r"E:\AusCoastline\Aus Coast Map.gdb"
             external_fishnets = []
             try:
                 arcpy.env.workspace = external_gdb
-                external_fishnets = arcpy.ListFeatureClasses("Fishnet_Clipped_Tile_*")
+                external_fishnets = arcpy.ListFeatureClasses("Fishnet_Clipped_*")
             except:
                 print("Could not access external drive geodatabase")
             
@@ -2,9 +2,11 @@ import arcpy
 import sys
 import os
 import math
+import concurrent.futures
 
 # Set up workspace and parameters
-arcpy.env.workspace = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Aus Coast Map.gdb"
+source_gdb = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Aus Coast Map.gdb"
+arcpy.env.workspace = source_gdb
 arcpy.env.overwriteOutput = True
 
 # Input parameters - UPDATED FOR 5KM GRID TILES
@@ -12,6 +14,8 @@ coastline_buffer = "coast_water_combined_buffer"  # Your coastline buffer layer
 output_workspace = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Output"  # Where to save results
 cell_size = "10"  # Final fishnet cell size in meters
 tile_size = 5000  # 5km tiles in meters
+num_workers = 4  # parallel tile workers - each gets its own scratch GDB
+batch_size = 8  # tiles per work unit (small batches avoid straggler workers)
 
 # Create output folder if it doesn't exist
 if not os.path.exists(output_workspace):
@@ -60,14 +64,11 @@ def create_processing_tiles(coastline_layer, tile_size_m):
         tiles_clipped = "processing_tiles_clipped"
         arcpy.analysis.Clip(tiles_fishnet, coastline_layer, tiles_clipped)
         
-        # Add tile ID field
+        # Add tile ID field and populate it from the ObjectID in one bulk
+        # UPDATE inside the geodatabase engine, instead of committing a
+        # per-row edit through an UpdateCursor
         arcpy.management.AddField(tiles_clipped, "TILE_ID", "LONG")
-        
-        # Populate tile ID
-        with arcpy.da.UpdateCursor(tiles_clipped, ["TILE_ID", "OID@"]) as cursor:
-            for row in cursor:
-                row[0] = row[1]  # Use ObjectID as tile ID
-                cursor.updateRow(row)
+        arcpy.management.CalculateField(tiles_clipped, "TILE_ID", "!OBJECTID!", "PYTHON3")
         
         # Clean up temporary layer
         arcpy.management.Delete(tiles_fishnet)
@@ -171,6 +172,67 @@ def process_tile(tile_id, tiles_layer, coastline_layer):
         print(f"  - Error processing tile {tile_id}: {str(e)}")
         return False
 
+def worker_init():
+    """Point each worker process at its own scratch file GDB.
+
+    Tiles are fully independent (Clip + CreateFishnet + Clip), but a file
+    geodatabase only allows one writer - giving every worker its own GDB
+    avoids schema lock contention entirely.
+    """
+    worker_gdb_name = f"worker_{os.getpid()}.gdb"
+    worker_gdb = os.path.join(output_workspace, worker_gdb_name)
+    if not arcpy.Exists(worker_gdb):
+        arcpy.management.CreateFileGDB(output_workspace, worker_gdb_name)
+    arcpy.env.workspace = worker_gdb
+    arcpy.env.overwriteOutput = True
+
+def process_tile_batch(tiles_path, coastline_path, tile_ids):
+    """Process a batch of tiles in a worker process, returning their results"""
+    return [process_tile(tile_id, tiles_path, coastline_path) for tile_id in tile_ids]
+
+processed_log = os.path.join(output_workspace, "processed_tiles.log")  # one tile ID per line
+
+def load_processed_tiles():
+    """Load the set of already-processed tile IDs from the sidecar log.
+
+    Walking the geodatabase catalog with ListFeatureClasses is O(N) catalog
+    reads on every restart; the log makes resume a single small file read.
+    Falls back to the catalog walk (and seeds the log) when the log is missing.
+    """
+    if os.path.exists(processed_log):
+        with open(processed_log) as f:
+            return {int(line) for line in f if line.strip()}
+
+    processed_tiles = set()
+    for workspace in [source_gdb] + list_worker_gdbs():
+        arcpy.env.workspace = workspace
+        for fishnet in arcpy.ListFeatureClasses("Fishnet_Clipped_Tile_*"):
+            tile_num = fishnet.split("_")[-1]
+            try:
+                processed_tiles.add(int(tile_num))
+            except:
+                pass
+    arcpy.env.workspace = source_gdb
+
+    with open(processed_log, "w") as f:
+        for tile_id in sorted(processed_tiles):
+            f.write(f"{tile_id}\n")
+    return processed_tiles
+
+def record_processed_tiles(tile_ids):
+    """Append newly completed tile IDs to the sidecar log (line-buffered)"""
+    with open(processed_log, "a", buffering=1) as f:
+        for tile_id in tile_ids:
+            f.write(f"{tile_id}\n")
+
+def list_worker_gdbs():
+    """Find the per-worker scratch GDBs from this and previous runs"""
+    if not os.path.exists(output_workspace):
+        return []
+    return [os.path.join(output_workspace, name)
+            for name in sorted(os.listdir(output_workspace))
+            if name.startswith("worker_") and name.endswith(".gdb")]
+
 def main():
     """Main processing function"""
     print("Starting automated coastal tile fishnet processing...")
@@ -203,33 +265,40 @@ def main():
     
     print(f"Found {len(tile_ids)} tiles to process (starting from tile {start_tile_id})")
     
-    # Check what's already been processed
-    existing_fishnets = arcpy.ListFeatureClasses("Fishnet_Clipped_Tile_*")
-    processed_tiles = set()
-    for fishnet in existing_fishnets:
-        tile_num = fishnet.split("_")[-1]
-        try:
-            processed_tiles.add(int(tile_num))
-        except:
-            pass
-    
+    # Check what's already been processed (sidecar log, catalog walk as fallback)
+    processed_tiles = load_processed_tiles()
     print(f"Found {len(processed_tiles)} already processed tiles")
-    
+
     # Filter out already processed tiles
     remaining_tiles = [tid for tid in tile_ids if tid not in processed_tiles]
     print(f"Remaining tiles to process: {len(remaining_tiles)}")
-    
-    for i, tile_id in enumerate(remaining_tiles, 1):
-        print(f"\n[{i}/{len(remaining_tiles)}] Processing tile {tile_id}")
-        
-        result = process_tile(tile_id, tiles_layer, coastline_buffer)
-        if result:
-            successful += 1
-        elif result is False:
-            failed += 1
-        else:
-            skipped += 1
-    
+
+    # Tiles are independent, so farm batches out to worker processes.
+    # Inputs are passed as full paths since workers point at their own GDBs.
+    tiles_path = os.path.join(source_gdb, tiles_layer)
+    coastline_path = os.path.join(source_gdb, coastline_buffer)
+    batches = [remaining_tiles[i:i + batch_size]
+               for i in range(0, len(remaining_tiles), batch_size)]
+
+    done = 0
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers, initializer=worker_init) as executor:
+        futures = {executor.submit(process_tile_batch, tiles_path, coastline_path, batch): batch
+                   for batch in batches}
+        for future in concurrent.futures.as_completed(futures):
+            batch = futures[future]
+            results = future.result()
+            for result in results:
+                done += 1
+                if result:
+                    successful += 1
+                elif result is False:
+                    failed += 1
+                else:
+                    skipped += 1
+            record_processed_tiles(tid for tid, result in zip(batch, results) if result)
+            print(f"[{done}/{len(remaining_tiles)}] tiles completed")
+
     print("\n" + "="*50)
     print("PROCESSING COMPLETE")
     print(f"Successful: {successful}")
@@ -241,10 +310,15 @@ def main():
     if successful > 0:
         print("\nMerging all fishnet results...")
         try:
-            # Find all fishnet outputs
-            arcpy.env.workspace = arcpy.env.workspace  # Reset to original workspace
-            fishnet_layers = arcpy.ListFeatureClasses("Fishnet_Clipped_Tile_*")
-            
+            # Find all fishnet outputs - main workspace plus the worker GDBs
+            arcpy.env.workspace = source_gdb
+            fishnet_layers = list(arcpy.ListFeatureClasses("Fishnet_Clipped_Tile_*"))
+            for worker_gdb in list_worker_gdbs():
+                arcpy.env.workspace = worker_gdb
+                fishnet_layers += [os.path.join(worker_gdb, fc)
+                                   for fc in arcpy.ListFeatureClasses("Fishnet_Clipped_Tile_*")]
+            arcpy.env.workspace = source_gdb
+
             if len(fishnet_layers) > 0:
                 merged_output = "Australia_Coastal_Fishnet_10m_5km_Tiles"
                 arcpy.management.Merge(fishnet_layers, merged_output)
@@ -59,14 +59,11 @@ def create_processing_tiles(coastline_layer, tile_size_m):
         tiles_clipped = "processing_tiles_clipped"
         arcpy.analysis.Clip(tiles_fishnet, coastline_layer, tiles_clipped)
         
-        # Add tile ID field
+        # Add tile ID field and populate it from the ObjectID in one bulk
+        # UPDATE inside the geodatabase engine, instead of committing a
+        # per-row edit through an UpdateCursor
         arcpy.management.AddField(tiles_clipped, "TILE_ID", "LONG")
-        
-        # Populate tile ID
-        with arcpy.da.UpdateCursor(tiles_clipped, ["TILE_ID", "OID@"]) as cursor:
-            for row in cursor:
-                row[0] = row[1]  # Use ObjectID as tile ID
-                cursor.updateRow(row)
+        arcpy.management.CalculateField(tiles_clipped, "TILE_ID", "!OBJECTID!", "PYTHON3")
         
         # Clean up temporary layer
         arcpy.management.Delete(tiles_fishnet)
@@ -82,37 +79,29 @@ def create_processing_tiles(coastline_layer, tile_size_m):
         print(f"Error creating tiles: {str(e)}")
         return None, 0
 
-def process_tile(tile_id, tiles_layer, coastline_layer):
+def process_tile(tile_id, coastline_by_tile):
     """Process a single coastal-intersecting tile with 10 * 10 meter grid"""
     try:
         print(f"Processing tile {tile_id}...")
-        
-        # Step 1: Select the current tile
-        tile_layer = "tile_selected"
-        arcpy.management.MakeFeatureLayer(tiles_layer, tile_layer, 
+
+        # Step 1: Pull this tile's pre-clipped coastline out of the bulk
+        # intersect output - an attribute select, not a per-tile spatial clip
+        tile_layer = "tile_coastline_selected"
+        arcpy.management.MakeFeatureLayer(coastline_by_tile, tile_layer,
                                         f"TILE_ID = {tile_id}")
-        
-        # Check if tile exists
+
+        # Check if this tile has any coastline
         result = arcpy.management.GetCount(tile_layer)
         count = int(result[0])
-        
-        if count == 0:
-            print(f"  - Tile {tile_id} not found, skipping...")
-            return False
-        
-        # Step 2: Clip coastline to this tile
-        coastline_clipped = f"Coastline_Tile_{tile_id}"
-        arcpy.analysis.Clip(coastline_layer, tile_layer, coastline_clipped)
-        
-        # Check if clipped coastline has features
-        result = arcpy.management.GetCount(coastline_clipped)
-        count = int(result[0])
-        
+
         if count == 0:
             print(f"  - No coastline found in tile {tile_id}, skipping...")
-            arcpy.management.Delete(coastline_clipped)
             return False
-        
+
+        # Step 2: Copy the selection so the fishnet has a concrete template
+        coastline_clipped = f"Coastline_Tile_{tile_id}"
+        arcpy.management.CopyFeatures(tile_layer, coastline_clipped)
+
         # Step 3: Get extent of clipped coastline
         desc = arcpy.Describe(coastline_clipped)
         extent = desc.extent
@@ -197,11 +186,18 @@ def main():
             tile_ids.append(row[0])
     
     print(f"Found {len(tile_ids)} tiles to process")
-    
+
+    # Clip the coastline against every tile in one multithreaded pass; the
+    # PairwiseIntersect output carries TILE_ID, so each tile's coastline
+    # becomes a cheap attribute select instead of a per-tile Clip call
+    coastline_by_tile = "Coastline_By_Tile"
+    print("Bulk-intersecting coastline with all tiles...")
+    arcpy.analysis.PairwiseIntersect([coastline_buffer, tiles_layer], coastline_by_tile)
+
     for i, tile_id in enumerate(tile_ids, 1):
         print(f"\n[{i}/{len(tile_ids)}] Processing tile {tile_id}")
-        
-        result = process_tile(tile_id, tiles_layer, coastline_buffer)
+
+        result = process_tile(tile_id, coastline_by_tile)
         if result:
             successful += 1
         elif result is False:
@@ -1,13 +1,22 @@
 import geopandas as gpd
+import pyogrio
+
+from _coast_utils import chunked_union, flatten_polygons, load_coast
+import numpy as np
+import shapely
+
+try:
+    import dask_geopandas  # optional - parallelizes the buffer phase across cores
+except ImportError:
+    dask_geopandas = None
 from shapely.geometry import Polygon, MultiPolygon, GeometryCollection
 from shapely.ops import unary_union
 
 # Read the shapefile
-coast_path = "coastlines_2-2-0.shp/coastlines_2-2-0_shorelines_annual.shp"
-gdf = gpd.read_file(coast_path)
+# load_coast pushes the year filter down to pyogrio on the first run and
+# caches the 2023 subset as GeoParquet for every other script in this folder
+gdf = load_coast()
 
-# Filter to year = 2023
-gdf = gdf[gdf["year"] == 2023]
 
 # Confirm projected CRS
 print("CRS:", gdf.crs)
@@ -21,27 +30,29 @@ from shapely.geometry import LineString, MultiLineString
 print("Combining all coastlines...")
 
 buffer_distance = 5000  # 5km buffer to close gaps
-coastlines = list(gdf.geometry)
+coastlines = np.asarray(gdf.geometry.values)  # geometry array - vectorized shapely 2 ops work on this directly
+
+if dask_geopandas is not None:
+    # Spatial shuffle keeps neighbouring coastlines in the same partition, so
+    # each core buffers a local neighbourhood
+    print(f"Buffering with {buffer_distance}m buffer across 8 dask partitions...")
+    ddf = dask_geopandas.from_geopandas(gdf, npartitions=8).spatial_shuffle(by="hilbert")
+    buffered = ddf.geometry.simplify(50).buffer(buffer_distance, resolution=2).compute()
+    buffered_pieces = np.asarray(buffered.values)
+else:
+    print(f"Buffering all geometries at once with {buffer_distance}m buffer (vectorized)...")
+    simplified = shapely.simplify(coastlines, tolerance=50, preserve_topology=True)  # reduce detail
+    buffered_pieces = shapely.buffer(simplified, buffer_distance, quad_segs=2)
 
-buffered_pieces = []
-print(f"Buffering each geometry individually with {buffer_distance}m buffer...")
-
-for i, geom in enumerate(coastlines):
-    try:
-        if geom and not geom.is_empty:
-            simplified = geom.simplify(50, preserve_topology=True)  # reduce detail
-            buffered = simplified.buffer(buffer_distance, resolution=2)
-            if not buffered.is_empty:
-                buffered_pieces.append(buffered)
-    except Exception as e:
-        print(f"⚠ Skipping geometry {i} due to error: {e}")
+buffered_pieces = shapely.make_valid(buffered_pieces)  # repair any bad inputs in one pass
+buffered_pieces = buffered_pieces[~shapely.is_empty(buffered_pieces)]
 
 print(f"Buffered {len(buffered_pieces)} geometries successfully.")
 
-# Merge the buffered pieces
+# Merge the buffered pieces (cascaded union over the geometry array)
 print("Merging buffered pieces...")
 try:
-    temp_buffer = unary_union(buffered_pieces)
+    temp_buffer = chunked_union(buffered_pieces)
 except Exception as e:
     print(f"❌ Failed to union all buffered pieces: {e}")
     raise SystemExit("Aborting due to union failure")
@@ -102,60 +113,59 @@ for i, polygon in enumerate(main_polygons):
     if oceanward_buffer and not oceanward_buffer.is_empty:
         all_buffers.append(oceanward_buffer)
 
-# STEP 4: Process all other islands with symmetric 500m buffer
+# STEP 4: Process all other islands with symmetric 500m buffer (one vectorized call)
 if 'other_polygons' in locals() and other_polygons:
     print(f"Processing {len(other_polygons)} smaller islands with 500m buffer")
-    for i, polygon in enumerate(other_polygons):
-        island_buffer = polygon.buffer(500)  # 500m all around
-        if not island_buffer.is_empty:
-            all_buffers.append(island_buffer)
-    
-    print(f"Added buffers for {len(other_polygons)} smaller islands")
+    island_arr = np.asarray(other_polygons, dtype=object)
+    island_buffers = shapely.buffer(island_arr, 500, quad_segs=2)  # 500m all around
+    island_buffers = island_buffers[~shapely.is_empty(island_buffers)]
+    all_buffers.extend(island_buffers.tolist())
+
+    print(f"Added buffers for {len(island_buffers)} smaller islands")
 
 print("Total buffer geometries:", len(all_buffers))
 
-# STEP 5: Union all buffers
-try:
-    combined_raw = unary_union(all_buffers)
-    print("Type of combined result:", type(combined_raw))
-    print("Is combined result empty?:", combined_raw.is_empty)
-except Exception as e:
-    print(f"Error in union operation: {e}")
-    # Try one-by-one approach
-    combined_raw = all_buffers[0]
-    for buff in all_buffers[1:]:
-        try:
-            combined_raw = combined_raw.union(buff)
-        except Exception as e:
-            print(f"Skipping a buffer due to error: {e}")
-
-# STEP 6: Flatten into individual polygons
-flattened = []
-if isinstance(combined_raw, (Polygon, MultiPolygon)):
-    flattened.append(combined_raw)
-elif isinstance(combined_raw, GeometryCollection):
-    flattened.extend([g for g in combined_raw.geoms if isinstance(g, (Polygon, MultiPolygon))])
-elif hasattr(combined_raw, '__iter__'):
-    for g in combined_raw:
-        if isinstance(g, (Polygon, MultiPolygon)):
-            flattened.append(g)
-        elif isinstance(g, GeometryCollection):
-            flattened.extend([geom for geom in g.geoms if isinstance(geom, (Polygon, MultiPolygon))])
+# STEP 5: Union all buffers - group by STRtree connectivity first so each
+# union call only sweeps buffers that actually touch
+all_buffers_arr = np.asarray(all_buffers, dtype=object)
+tree = shapely.STRtree(all_buffers_arr)
+pairs_i, pairs_j = tree.query(all_buffers_arr, predicate="intersects")
+
+# Union-find over the intersecting pairs to label connected components
+parent = list(range(len(all_buffers_arr)))
+
+def find(a):
+    while parent[a] != a:
+        parent[a] = parent[parent[a]]  # path halving
+        a = parent[a]
+    return a
+
+for a, b in zip(pairs_i, pairs_j):
+    root_a, root_b = find(int(a)), find(int(b))
+    if root_a != root_b:
+        parent[root_b] = root_a
+
+labels = np.array([find(i) for i in range(len(all_buffers_arr))])
+
+# Union each component; singletons are already polygons and skip the union.
+# Components are disjoint by construction, so no final union pass is needed.
+combined_raw = []
+for label in np.unique(labels):
+    members = all_buffers_arr[labels == label]
+    combined_raw.append(members[0] if len(members) == 1 else unary_union(members))
+
+print(f"Unioned {len(all_buffers_arr)} buffers into {len(combined_raw)} disjoint groups")
+
+# STEP 6: Flatten into individual polygons (one C call via get_parts)
+flattened = flatten_polygons(combined_raw)
 
 print(f"Number of flattened geometries: {len(flattened)}")
 
-# Make sure all geometries are valid
-valid_geoms = []
-for geom in flattened:
-    if geom.is_valid:
-        valid_geoms.append(geom)
-    else:
-        try:
-            fixed = geom.buffer(0)  # Common trick to fix invalid geometries
-            if fixed.is_valid and not fixed.is_empty:
-                valid_geoms.append(fixed)
-        except Exception:
-            print("Skipping an invalid geometry")
+# Make sure all geometries are valid - repair only the invalid ones, in one pass
+invalid = ~shapely.is_valid(flattened)
+if invalid.any():
+    flattened[invalid] = shapely.make_valid(flattened[invalid])
+valid_geoms = flattened[~shapely.is_empty(flattened)]
 
 print(f"Final valid geometries: {len(valid_geoms)}")
 
@@ -163,6 +173,7 @@ print(f"Final valid geometries: {len(valid_geoms)}")
 gdf_out = gpd.GeoDataFrame(geometry=valid_geoms, crs=gdf.crs)
 print("Geometry types in final output:", gdf_out.geometry.geom_type.unique())
 
-# STEP 8: Save to shapefile
-gdf_out.to_file("coast_buffer_please.shp")
-print("Successfully saved buffer shapefile")
\ No newline at end of file
+# STEP 8: Save to GeoPackage (single SQLite transaction - much faster than
+# shapefile sidecar writes, and no 2GB / field-name limits)
+pyogrio.write_dataframe(gdf_out, "coast_buffer_please.gpkg", driver="GPKG", use_arrow=True)
+print("Successfully saved buffer GeoPackage")
\ No newline at end of file
@@ -1,21 +1,27 @@
 import geopandas as gpd
+import pyogrio
+
+from _coast_utils import chunked_union, flatten_polygons, load_coast
+import numpy as np
+import shapely
 from shapely.geometry import Polygon, MultiPolygon, GeometryCollection, LineString
 from shapely.ops import unary_union
 
 # Read the shapefile ===
-coast_path = "coastlines_2-2-0.shp/coastlines_2-2-0_shorelines_annual.shp"
-gdf = gpd.read_file(coast_path)
+# load_coast pushes the year filter down to pyogrio on the first run and
+# caches the 2023 subset as GeoParquet for every other script in this folder
+gdf = load_coast()
 
-# Filter to year = 2023 ===
-gdf = gdf[gdf["year"] == 2023]
 
 # === 3. Confirm projected CRS (should be EPSG:3577)
 print("CRS:", gdf.crs)  # Should say GDA94 / Australia Albers (EPSG:3577)
 
 # Separate main coastline from islands by length
-gdf["length_m"] = gdf.geometry.length
-main_coast = gdf[gdf["length_m"] > 260000]     # lines > 260 km = mainland coast
-islands = gdf[gdf["length_m"] <= 260000]       # smaller lines = islands
+# One C pass over the coordinates; no need to materialize a length_m column
+lengths = shapely.length(np.asarray(gdf.geometry.values))
+main_mask = lengths > 260000
+main_coast = gdf.iloc[main_mask]     # lines > 260 km = mainland coast
+islands = gdf.iloc[~main_mask]       # smaller lines = islands
 
 print("Mainland coast geometries:", len(main_coast))
 print("Island geometries:", len(islands))
@@ -70,23 +76,13 @@ print("Total input geometries:", len(all_buffers))
 print("Geometry types in all_buffers:")
 print([geom.geom_type for geom in all_buffers[:5]])  # preview first 5
 
-# Step 5: Union everything
-combined_raw = unary_union(all_buffers)
+# Step 5: Union everything (cascaded union over the buffer list)
+combined_raw = chunked_union(all_buffers)
 print("Type of combined result:", type(combined_raw))
 print("Is combined result empty?:", combined_raw.is_empty)
 
-# Step 6: Flatten into individual polygons
-flattened = []
-if isinstance(combined_raw, (Polygon, MultiPolygon)):
-    flattened.append(combined_raw)
-elif isinstance(combined_raw, GeometryCollection):
-    flattened.extend([g for g in combined_raw.geoms if isinstance(g, (Polygon, MultiPolygon))])
-elif hasattr(combined_raw, '__iter__'):
-    for g in combined_raw:
-        if isinstance(g, (Polygon, MultiPolygon)):
-            flattened.append(g)
-        elif isinstance(g, GeometryCollection):
-            flattened.extend([geom for geom in g.geoms if isinstance(geom, (Polygon, MultiPolygon))])
+# Step 6: Flatten into individual polygons (one C call via get_parts)
+flattened = flatten_polygons(combined_raw)
 
 print(f"Number of flattened geometries: {len(flattened)}")
 print("Flattened geometry types:", [g.geom_type for g in flattened[:5]])
@@ -95,6 +91,7 @@ print("Flattened geometry types:", [g.geom_type for g in flattened[:5]])
 gdf_out = gpd.GeoDataFrame(geometry=flattened, crs=gdf.crs)
 print("Geometry types in final output:", gdf_out.geometry.geom_type.unique())
 
-# Step 8: Save to shapefile
-gdf_out.to_file("coast_buffer_try4.shp")
-print("Successfully saved buffer shapefile")
+# Step 8: Save to GeoPackage (single SQLite transaction - much faster than
+# shapefile sidecar writes, and no 2GB / field-name limits)
+pyogrio.write_dataframe(gdf_out, "coast_buffer_try4.gpkg", driver="GPKG", use_arrow=True)
+print("Successfully saved buffer GeoPackage")
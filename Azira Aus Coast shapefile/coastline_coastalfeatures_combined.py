@@ -1,13 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import geopandas as gpd
+import orjson
+import pyogrio
+import pyproj
+
+from _coast_utils import chunked_union, flatten_polygons, load_coast, safe_union
+import numpy as np
+import shapely
+
+try:
+    import dask_geopandas  # optional - parallelizes the buffer phase across cores
+except ImportError:
+    dask_geopandas = None
 from shapely.geometry import LineString, MultiLineString, Polygon, MultiPolygon, GeometryCollection
 from shapely.ops import unary_union
 
 # Read the shapefile
-coast_path = "coastlines_2-2-0.shp/coastlines_2-2-0_shorelines_annual.shp"
-gdf = gpd.read_file(coast_path)
+# load_coast pushes the year filter down to pyogrio on the first run and
+# caches the 2023 subset as GeoParquet for every other script in this folder
+gdf = load_coast()
 
-# Filter to year = 2023
-gdf = gdf[gdf["year"] == 2023]
 
 # Confirm projected CRS
 print("CRS:", gdf.crs)
@@ -17,27 +30,34 @@ print("Total coastline geometries:", len(gdf))
 print("Combining all coastlines...")
 
 buffer_distance = 3000  # 5km buffer to close gaps
-coastlines = list(gdf.geometry)
-
-buffered_pieces = []
-print(f"Buffering each geometry individually with {buffer_distance}m buffer...")
+coastlines = np.asarray(gdf.geometry.values)  # geometry array - vectorized shapely 2 ops work on this directly
+
+print(f"Buffering all geometries at once with {buffer_distance}m buffer (vectorized)...")
+
+# Plain Douglas-Peucker (preserve_topology=False) is much faster and 100m
+# tolerance is still far below the gap-closing buffer distance; these rough
+# buffers get unioned and re-buffered anyway, so quad_segs=1 arcs are plenty
+if dask_geopandas is not None:
+    # Spatial shuffle keeps neighbouring coastlines in the same partition, so
+    # each core buffers a local neighbourhood
+    print(f"Buffering with {buffer_distance}m buffer across 8 dask partitions...")
+    ddf = dask_geopandas.from_geopandas(gdf, npartitions=8).spatial_shuffle(by="hilbert")
+    buffered = ddf.geometry.simplify(100, preserve_topology=False).buffer(
+        buffer_distance, resolution=1).compute()
+    buffered_pieces = np.asarray(buffered.values)
+else:
+    simplified = shapely.simplify(coastlines, tolerance=100, preserve_topology=False)
+    buffered_pieces = shapely.buffer(simplified, buffer_distance, quad_segs=1)
 
-for i, geom in enumerate(coastlines):
-    try:
-        if geom and not geom.is_empty:
-            simplified = geom.simplify(50, preserve_topology=True)  # reduce detail
-            buffered = simplified.buffer(buffer_distance, resolution=2)
-            if not buffered.is_empty:
-                buffered_pieces.append(buffered)
-    except Exception as e:
-        print(f"⚠ Skipping geometry {i} due to error: {e}")
+buffered_pieces = shapely.make_valid(buffered_pieces)  # repair any bad inputs in one pass
+buffered_pieces = buffered_pieces[~shapely.is_empty(buffered_pieces)]
 
 print(f"Buffered {len(buffered_pieces)} geometries successfully.")
 
-# Merge the buffered pieces
+# Merge the buffered pieces (cascaded union over the geometry array)
 print("Merging buffered pieces...")
 try:
-    temp_buffer = unary_union(buffered_pieces)
+    temp_buffer = chunked_union(buffered_pieces)
 except Exception as e:
     print(f"❌ Failed to union all buffered pieces: {e}")
     raise SystemExit("Aborting due to union failure")
@@ -114,48 +134,23 @@ if 'other_polygons' in locals() and other_polygons:
 
 print("Total buffer geometries:", len(all_buffers))
 
-# STEP 5: Union all buffers
-try:
-    combined_raw = unary_union(all_buffers)
-    print("Type of combined result:", type(combined_raw))
-    print("Is combined result empty?:", combined_raw.is_empty)
-except Exception as e:
-    print(f"Error in union operation: {e}")
-    # Try one-by-one approach
-    combined_raw = all_buffers[0]
-    for buff in all_buffers[1:]:
-        try:
-            combined_raw = combined_raw.union(buff)
-        except Exception as e:
-            print(f"Skipping a buffer due to error: {e}")
-
-# STEP 6: Flatten into individual polygons
-flattened = []
-if isinstance(combined_raw, (Polygon, MultiPolygon)):
-    flattened.append(combined_raw)
-elif isinstance(combined_raw, GeometryCollection):
-    flattened.extend([g for g in combined_raw.geoms if isinstance(g, (Polygon, MultiPolygon))])
-elif hasattr(combined_raw, '__iter__'):
-    for g in combined_raw:
-        if isinstance(g, (Polygon, MultiPolygon)):
-            flattened.append(g)
-        elif isinstance(g, GeometryCollection):
-            flattened.extend([geom for geom in g.geoms if isinstance(geom, (Polygon, MultiPolygon))])
+# STEP 5: Union all buffers - safe_union bisects out any geometry that makes
+# GEOS throw, so there's no O(n^2) one-by-one fallback any more
+combined_raw = safe_union(all_buffers)
+print("Type of combined result:", type(combined_raw))
+print("Is combined result empty?:", combined_raw.is_empty)
+
+# STEP 6: Flatten into individual polygons (one C call via get_parts)
+flattened = flatten_polygons(combined_raw)
 
 print(f"Number of flattened coastline buffer geometries: {len(flattened)}")
 
-# Make sure all geometries are valid
-valid_geoms = []
-for geom in flattened:
-    if geom.is_valid:
-        valid_geoms.append(geom)
-    else:
-        try:
-            fixed = geom.buffer(0)  # Common trick to fix invalid geometries
-            if fixed.is_valid and not fixed.is_empty:
-                valid_geoms.append(fixed)
-        except Exception:
-            print("Skipping an invalid geometry")
+# Make sure all geometries are valid - is_valid/make_valid/is_empty are all
+# one C loop over the array, no per-geometry Python or buffer(0) calls
+invalid = ~shapely.is_valid(flattened)
+if invalid.any():
+    flattened[invalid] = shapely.make_valid(flattened[invalid])
+valid_geoms = flattened[~shapely.is_empty(flattened)]
 
 print(f"Final valid coastline buffer geometries: {len(valid_geoms)}")
 
@@ -164,36 +159,57 @@ water_bodies_path = "coastal_geomorphological_features/1_Coastal Geomorphic Feat
 print(f"Loading water bodies from: {water_bodies_path}")
 
 try:
-    water_gdf = gpd.read_file(water_bodies_path)
+    # Only deserialize water bodies near the coastal buffer: pyogrio pushes
+    # the bbox into GDAL's OGR spatial filter, so inland features are never
+    # read. The bbox is transformed to the source CRS if they differ.
+    bbox = tuple(shapely.total_bounds(valid_geoms))
+    source_crs = pyogrio.read_info(water_bodies_path)["crs"]
+    if source_crs and gdf.crs and source_crs != gdf.crs:
+        bbox = pyproj.Transformer.from_crs(
+            gdf.crs, source_crs, always_xy=True).transform_bounds(*bbox)
+    # pyogrio + Arrow streams features in C instead of fiona's per-feature path
+    water_gdf = pyogrio.read_dataframe(water_bodies_path, bbox=bbox, use_arrow=True)
     print(f"Loaded {len(water_gdf)} water body features")
     print(f"Water bodies CRS: {water_gdf.crs}")
     
-    # Check if CRS needs to be aligned
+    # Check if CRS needs to be aligned - build one pyproj Transformer and
+    # push all vertices through it in a single vectorized call, instead of
+    # to_crs initializing a PROJ pipeline and walking geometries per row
     if water_gdf.crs != gdf.crs:
         print(f"Reprojecting water bodies from {water_gdf.crs} to {gdf.crs}")
-        water_gdf = water_gdf.to_crs(gdf.crs)
+        tr = pyproj.Transformer.from_crs(water_gdf.crs, gdf.crs, always_xy=True)
+        reprojected = shapely.transform(
+            np.asarray(water_gdf.geometry.values),
+            lambda xy: np.column_stack(tr.transform(xy[:, 0], xy[:, 1])))
+        water_gdf = water_gdf.set_geometry(reprojected, crs=gdf.crs)
     
     # Get water body geometries
-    water_geoms = list(water_gdf.geometry)
+    water_geoms = np.asarray(water_gdf.geometry.values)
     print(f"Processing {len(water_geoms)} water body geometries")
-    
-    # Union water bodies if needed
+
+    # Union water bodies - GEOS's UnaryUnion already does a cascaded
+    # STR-tree merge internally; if it throws, repair the inputs in one
+    # vectorized make_valid pass and retry rather than falling back to the
+    # old one-by-one .union() accumulate (which is O(n^2))
     try:
         water_union = unary_union(water_geoms)
         print("Successfully unioned water bodies")
     except Exception as e:
         print(f"Error unioning water bodies: {e}")
-        # Fallback: Process individually
-        water_union = water_geoms[0]
-        for wg in water_geoms[1:]:
-            try:
-                water_union = water_union.union(wg)
-            except:
-                continue
+        fixed = shapely.make_valid(water_geoms)
+        water_union = unary_union(fixed[~shapely.is_empty(fixed)])
+        print("Unioned water bodies after make_valid repair")
     
-    # Combine coastal buffer with water bodies
+    # Combine coastal buffer with water bodies. Union in 1000-geometry
+    # batches so the peak resident polygon count stays bounded (GEOS's
+    # UnaryUnion scales superlinearly past its tree-cache limits), and run
+    # the batch pass on a thread pool - shapely's ufuncs release the GIL
+    # inside GEOS, so the partial unions genuinely overlap.
     print("Combining coastal buffer with water bodies...")
-    coastal_buffer_union = unary_union(valid_geoms)
+    batches = [valid_geoms[i:i + 1000] for i in range(0, len(valid_geoms), 1000)]
+    with ThreadPoolExecutor() as pool:
+        partials = list(pool.map(shapely.unary_union, batches))
+    coastal_buffer_union = shapely.unary_union(np.asarray(partials, dtype=object))
     
     try:
         final_union = coastal_buffer_union.union(water_union)
@@ -204,11 +220,7 @@ try:
         print("Continuing with just the coastal buffer")
     
     # Flatten the final result
-    final_geoms = []
-    if isinstance(final_union, (Polygon, MultiPolygon)):
-        final_geoms.append(final_union)
-    elif isinstance(final_union, GeometryCollection):
-        final_geoms.extend([g for g in final_union.geoms if isinstance(g, (Polygon, MultiPolygon))])
+    final_geoms = flatten_polygons(final_union)
     
     print(f"Final combined geometries: {len(final_geoms)}")
     
@@ -221,12 +233,19 @@ except Exception as e:
 gdf_out = gpd.GeoDataFrame(geometry=final_geoms, crs=gdf.crs)
 print("Geometry types in final output:", gdf_out.geometry.geom_type.unique())
 
-# STEP 9: Save to shapefile
-output_file = "coast_water_combined_buffer.shp"
-gdf_out.to_file(output_file)
-print(f"Successfully saved combined buffer shapefile to {output_file}")
+# STEP 9: Save as GeoParquet - the primary output for the downstream scripts.
+# Columnar WKB + zstd is a fraction of the GPKG/shapefile size and reads back
+# fastest via gpd.read_parquet (don't route the parquet through pyogrio).
+output_file = "coast_water_combined_buffer.parquet"
+gdf_out.to_parquet(output_file, compression="zstd", geometry_encoding="WKB")
+print(f"Successfully saved combined buffer GeoParquet to {output_file}")
 
-# Save as GeoJSON
+# Keep one GeoJSON copy for the web-map consumers. gdf_out is geometry-only,
+# so skip the general-purpose feature serializer: shapely.to_geojson encodes
+# every geometry in one vectorized C call and orjson dumps the envelope.
 geojson_output_file = "coast_water_combined_buffer.geojson"
-gdf_out.to_file(geojson_output_file, driver="GeoJSON")
+features = [{"type": "Feature", "geometry": orjson.loads(g), "properties": {}}
+            for g in shapely.to_geojson(np.asarray(gdf_out.geometry.values))]
+with open(geojson_output_file, "wb") as f:
+    f.write(orjson.dumps({"type": "FeatureCollection", "features": features}))
 print(f"Successfully saved combined buffer as GeoJSON to {geojson_output_file}")
\ No newline at end of file
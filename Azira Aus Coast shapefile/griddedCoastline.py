@@ -33,11 +33,15 @@ def process_lga(suburb_name):
         # Clean the suburb name for file naming
         clean_name = clean_filename(suburb_name)
         
-        # Step 1: Select the current suburb
-        suburb_layer = "suburb_selected"
-        arcpy.management.MakeFeatureLayer(lga_boundaries, suburb_layer, 
-                                        f"{lga_name_field} = '{suburb_name}'")
-        
+        # Step 1: Select the current suburb on the shared layer. Apostrophes
+        # in names (e.g. "King's Park") are escaped by doubling - the old
+        # f-string definition query crashed on them - and the attribute
+        # index built in main() makes this a lookup, not a table scan
+        suburb_layer = "all_suburbs"
+        escaped = suburb_name.replace("'", "''")
+        arcpy.management.SelectLayerByAttribute(suburb_layer, "NEW_SELECTION",
+                                                f"{lga_name_field} = '{escaped}'")
+
         # Step 2: Clip coastline to this suburb
         coastline_clipped = f"Coastline_{clean_name}"
         arcpy.analysis.Clip(coastline_buffer, suburb_layer, coastline_clipped)
@@ -118,7 +122,15 @@ def main():
             suburb_names.append(row[0])
     
     print(f"Found {len(suburb_names)} suburbs to process")
-    
+
+    # Build the suburb selection layer once, with an attribute index on the
+    # name field, instead of re-creating a filtered feature layer per suburb
+    arcpy.management.MakeFeatureLayer(lga_boundaries, "all_suburbs")
+    try:
+        arcpy.management.AddIndex(lga_boundaries, [lga_name_field], "name_idx")
+    except Exception:
+        pass  # index already exists from a previous run
+
     # Process each suburb
     successful = 0
     failed = 0
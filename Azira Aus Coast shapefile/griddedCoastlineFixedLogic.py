@@ -1,6 +1,12 @@
 import arcpy
 import sys
 import os
+import concurrent.futures
+
+import geopandas as gpd
+import numpy as np
+import pyogrio
+import shapely
 
 # Set up workspace and parameters
 main_workspace = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Aus Coast Map.gdb"
@@ -13,11 +19,80 @@ lga_boundaries = "Suburbs"  # Your suburb boundaries layer
 lga_name_field = "SAL_NAME21"  # Field containing suburb names
 output_workspace = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Output"  # Where to save results
 cell_size = "10"  # Grid cell size in meters
+num_workers = os.cpu_count()  # suburbs are independent - one worker per core
 
 # Create output folder if it doesn't exist
 if not os.path.exists(output_workspace):
     os.makedirs(output_workspace)
 
+def worker_init():
+    """Point each worker process at its own scratch file GDB.
+
+    Suburbs are fully independent (Clip + CreateFishnet + Clip), but a file
+    geodatabase only allows one writer - giving every worker its own GDB
+    avoids schema lock contention entirely.
+    """
+    worker_gdb_name = f"worker_{os.getpid()}.gdb"
+    worker_gdb = os.path.join(output_workspace, worker_gdb_name)
+    if not arcpy.Exists(worker_gdb):
+        arcpy.management.CreateFileGDB(output_workspace, worker_gdb_name)
+    arcpy.env.workspace = worker_gdb
+    arcpy.env.overwriteOutput = True
+
+# Per-process copies of the coastline and suburbs, loaded lazily on first use.
+# The old code rebuilt a feature layer with a SAL_NAME21 = '...' query for
+# every suburb, which made GDAL rescan the suburb FC thousands of times; each
+# worker now reads both layers once and answers every suburb from an STR-tree.
+_coast_arr = None
+_coast_tree = None
+_coast_crs = None
+_suburb_geoms = None
+
+def numpy_fishnet(xmin, ymin, xmax, ymax, cell):
+    """Build fishnet cell polygons in one batched shapely.polygons call.
+
+    meshgrid gives every cell's lower-left corner; broadcasting the four
+    corner offsets packs the rings into an (N, 5, 2) coordinate array that
+    shapely turns into polygons in a single C pass - no per-cell Python.
+    """
+    xs = np.arange(xmin, xmax, cell)
+    ys = np.arange(ymin, ymax, cell)
+    x0, y0 = np.meshgrid(xs, ys)
+    x0 = x0.ravel()
+    y0 = y0.ravel()
+    coords = np.stack([
+        np.column_stack([x0, y0]),
+        np.column_stack([x0 + cell, y0]),
+        np.column_stack([x0 + cell, y0 + cell]),
+        np.column_stack([x0, y0 + cell]),
+        np.column_stack([x0, y0]),
+    ], axis=1)
+    return shapely.polygons(coords)
+
+def load_layers():
+    """Read the coastline and suburbs into memory once per worker process"""
+    global _coast_arr, _coast_tree, _coast_crs, _suburb_geoms
+    if _coast_tree is not None:
+        return
+    coast_gdf = pyogrio.read_dataframe(main_workspace, layer=coastline_buffer,
+                                       use_arrow=True)
+    _coast_crs = coast_gdf.crs
+    _coast_arr = np.asarray(coast_gdf.geometry.values)
+    _coast_tree = shapely.STRtree(_coast_arr)
+    suburbs_gdf = pyogrio.read_dataframe(main_workspace, layer=lga_boundaries,
+                                         use_arrow=True)
+    # A suburb name can map to several rows - keep them all for the clip
+    _suburb_geoms = suburbs_gdf.groupby(lga_name_field).geometry.apply(
+        lambda s: shapely.unary_union(np.asarray(s.values))).to_dict()
+
+def list_worker_gdbs():
+    """Find the per-worker scratch GDBs from this and previous runs"""
+    if not os.path.exists(output_workspace):
+        return []
+    return [os.path.join(output_workspace, name)
+            for name in sorted(os.listdir(output_workspace))
+            if name.startswith("worker_") and name.endswith(".gdb")]
+
 def clean_filename(name):
     """Clean suburb name to be valid filename"""
     # Remove invalid characters and replace spaces
@@ -34,70 +109,61 @@ def process_lga(suburb_name):
         # Clean the suburb name for file naming
         clean_name = clean_filename(suburb_name)
         
-        # Step 1: Select the current suburb
-        suburb_layer = "suburb_selected"
-        arcpy.management.MakeFeatureLayer(lga_boundaries, suburb_layer, 
-                                        f"{lga_name_field} = '{suburb_name}'")
-        
-        # Step 2: Clip coastline to this suburb
-        coastline_clipped = f"Coastline_{clean_name}"
-        arcpy.analysis.Clip(coastline_buffer, suburb_layer, coastline_clipped)
-        
-        # Check if clipped coastline has features
-        result = arcpy.management.GetCount(coastline_clipped)
-        count = int(result[0])
-        
-        if count == 0:
+        # Step 1: Look up the suburb geometry from the preloaded dict
+        load_layers()
+        suburb_geom = _suburb_geoms.get(suburb_name)
+        if suburb_geom is None:
+            print(f"  - Suburb {suburb_name} not found, skipping...")
+            return "skipped"
+
+        # Step 2: Clip coastline to this suburb - STR-tree candidates, then
+        # one vectorized intersection (no per-suburb GDAL scan or Clip call)
+        candidates = _coast_tree.query(suburb_geom, predicate="intersects")
+        clipped = shapely.intersection(_coast_arr[candidates], suburb_geom)
+        clipped = clipped[~shapely.is_empty(clipped)]
+
+        if len(clipped) == 0:
             print(f"  - No coastline found in {suburb_name}, skipping...")
-            arcpy.management.Delete(coastline_clipped)
             return "skipped"
-        
+
         # Step 3: Get extent of clipped coastline
-        desc = arcpy.Describe(coastline_clipped)
-        extent = desc.extent
-        
-        # Step 4: Create fishnet
-        fishnet_output = f"Fishnet_{clean_name}"
-        origin_coord = f"{extent.XMin} {extent.YMin}"
-        y_axis_coord = f"{extent.XMin} {extent.YMax}"
-        
+        xmin, ymin, xmax, ymax = shapely.total_bounds(clipped)
+
         # Calculate number of rows and columns based on extent and cell size
         cell_size_num = float(cell_size)
-        num_cols = int((extent.XMax - extent.XMin) / cell_size_num) + 1
-        num_rows = int((extent.YMax - extent.YMin) / cell_size_num) + 1
-        
+        num_cols = int((xmax - xmin) / cell_size_num) + 1
+        num_rows = int((ymax - ymin) / cell_size_num) + 1
+
         # Safety check for too many cells - keep 10m for suburbs
         total_cells = num_cols * num_rows
         if total_cells > 10000000:  # 10 million cell safety limit for suburbs
             print(f"  - Warning: {suburb_name} would create {total_cells:,} cells, skipping...")
-            arcpy.management.Delete(coastline_clipped)
             return "failed"
-        
+
         print(f"  - Creating fishnet with {total_cells:,} cells...")
-        
-        # Create the fishnet with 10m cells
-        arcpy.management.CreateFishnet(
-            out_feature_class=fishnet_output,
-            origin_coord=origin_coord,
-            y_axis_coord=y_axis_coord,
-            cell_width=cell_size,
-            cell_height=cell_size,
-            number_rows="",
-            number_columns="",
-            corner_coord=f"{extent.XMax} {extent.YMax}",
-            labels="NO_LABELS",
-            template=coastline_clipped,
-            geometry_type="POLYGON"
-        )
-        
-        # Step 5: Clip fishnet to actual coastline shape
+
+        # Step 4: Build the fishnet as a NumPy coordinate array and one
+        # batched shapely.polygons call - CreateFishnet serialized millions
+        # of cells to a feature class just so Clip could throw most away
+        cells = numpy_fishnet(xmin, ymin, xmax, ymax, cell_size_num)
+
+        # Step 5: Clip fishnet to actual coastline shape - STR-tree filter
+        # down to intersecting cells, then one vectorized intersection
+        coast_union = shapely.unary_union(clipped)
+        hit = shapely.STRtree(cells).query(coast_union, predicate="intersects")
+        cell_clips = shapely.intersection(cells[hit], coast_union)
+        cell_clips = cell_clips[~shapely.is_empty(cell_clips)]
+
+        if len(cell_clips) == 0:
+            print(f"  - No grid cells left in {suburb_name} after clipping, skipping...")
+            return "skipped"
+
+        # Single write of the finished grid into the worker GDB
         fishnet_clipped = f"Fishnet_Clipped_{clean_name}"
-        arcpy.analysis.Clip(fishnet_output, coastline_clipped, fishnet_clipped)
-        
-        # Clean up intermediate files
-        arcpy.management.Delete(coastline_clipped)
-        arcpy.management.Delete(fishnet_output)
-        
+        out_gdf = gpd.GeoDataFrame(geometry=cell_clips, crs=_coast_crs)
+        pyogrio.write_dataframe(out_gdf, arcpy.env.workspace,
+                                layer=fishnet_clipped, driver="OpenFileGDB")
+
         print(f"  - Successfully processed {suburb_name}")
         return "success"
         
@@ -122,25 +188,23 @@ def main():
     
     print(f"Found {len(suburb_names)} suburbs to process")
     
-    # Process each suburb
+    # Process each suburb - suburbs are independent, so farm them out to
+    # worker processes (each writing to its own scratch GDB)
     successful = 0
     failed = 0
     skipped = 0
-    successful_layers = []
-    
-    for i, suburb_name in enumerate(suburb_names, 1):
-        print(f"\n[{i}/{len(suburb_names)}] Processing: {suburb_name}")
-        
-        result = process_lga(suburb_name)
-        if result == "success":
-            successful += 1
-            # Track successful layer names for merging
-            clean_name = clean_filename(suburb_name)
-            successful_layers.append(f"Fishnet_Clipped_{clean_name}")
-        elif result == "failed":
-            failed += 1
-        elif result == "skipped":
-            skipped += 1
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers, initializer=worker_init) as executor:
+        results = executor.map(process_lga, suburb_names, chunksize=4)
+        for i, result in enumerate(results, 1):
+            if result == "success":
+                successful += 1
+            elif result == "failed":
+                failed += 1
+            elif result == "skipped":
+                skipped += 1
+            print(f"[{i}/{len(suburb_names)}] suburbs completed")
     
     print("\n" + "="*50)
     print("PROCESSING COMPLETE")
@@ -149,7 +213,14 @@ def main():
     print(f"Skipped (no coastline): {skipped}")
     print(f"Total: {len(suburb_names)}")
     
-    # Merge all successful results
+    # Merge all successful results - gather them from the worker GDBs
+    successful_layers = []
+    for worker_gdb in list_worker_gdbs():
+        arcpy.env.workspace = worker_gdb
+        successful_layers += [os.path.join(worker_gdb, fc)
+                              for fc in arcpy.ListFeatureClasses("Fishnet_Clipped_*")]
+    arcpy.env.workspace = main_workspace
+
     if successful > 0 and len(successful_layers) > 0:
         print(f"\nMerging {len(successful_layers)} successful fishnet results...")
         try:
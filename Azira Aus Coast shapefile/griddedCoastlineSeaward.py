@@ -2,6 +2,11 @@ import arcpy
 import sys
 import os
 
+import geopandas as gpd
+import numpy as np
+import pyogrio
+import shapely
+
 # Set up workspace and parameters
 main_workspace = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Aus Coast Map.gdb"
 arcpy.env.workspace = main_workspace
@@ -88,6 +93,26 @@ def cut_coastline_into_chunks():
         print(f"Error cutting coastline: {str(e)}")
         return None
 
+# Below this many cells, arcpy tool startup and feature-class creation cost
+# more than the grid itself - build those chunks in memory instead
+numpy_fishnet_limit = 100_000
+
+def numpy_fishnet(xmin, ymin, xmax, ymax, cell):
+    """Batch-construct fishnet cells as an (N, 5, 2) ring array for shapely"""
+    xs = np.arange(xmin, xmax, cell)
+    ys = np.arange(ymin, ymax, cell)
+    x0, y0 = np.meshgrid(xs, ys)
+    x0 = x0.ravel()
+    y0 = y0.ravel()
+    coords = np.stack([
+        np.column_stack([x0, y0]),
+        np.column_stack([x0 + cell, y0]),
+        np.column_stack([x0 + cell, y0 + cell]),
+        np.column_stack([x0, y0 + cell]),
+        np.column_stack([x0, y0]),
+    ], axis=1)
+    return shapely.polygons(coords)
+
 def process_coastline_chunk(chunk_oid):
     """Process a single coastline chunk"""
     try:
@@ -118,8 +143,35 @@ def process_coastline_chunk(chunk_oid):
             print(f"  - Warning: Chunk {chunk_oid} would create {total_cells:,} cells, skipping...")
             return None
         
+        # Fast path for small chunks: build the grid with one batched
+        # shapely.polygons call, clip it in memory, and write the finished
+        # cells once - most coastal chunks land well under the limit after
+        # clipping, and CreateFishnet's per-call overhead dwarfs them
+        if total_cells < numpy_fishnet_limit:
+            print(f"  - Building {total_cells:,} cells in memory (small chunk)...")
+            with arcpy.da.SearchCursor(chunk_layer, ["SHAPE@WKB"]) as cursor:
+                chunk_geom = shapely.unary_union(
+                    [shapely.from_wkb(bytes(row[0])) for row in cursor])
+            cells = numpy_fishnet(extent.XMin, extent.YMin,
+                                  extent.XMax, extent.YMax, cell_size_num)
+            hit = shapely.STRtree(cells).query(chunk_geom, predicate="intersects")
+            cell_clips = shapely.intersection(cells[hit], chunk_geom)
+            cell_clips = cell_clips[~shapely.is_empty(cell_clips)]
+
+            sr_code = arcpy.Describe(chunk_layer).spatialReference.factoryCode
+            fishnet_clipped = f"Fishnet_Clipped_Chunk_{chunk_oid}"
+            out_gdf = gpd.GeoDataFrame(
+                {"CHUNK_ID": np.full(len(cell_clips), chunk_oid, dtype="int64")},
+                geometry=cell_clips,
+                crs=f"EPSG:{sr_code}" if sr_code else None)
+            pyogrio.write_dataframe(out_gdf, main_workspace,
+                                    layer=fishnet_clipped, driver="OpenFileGDB")
+
+            print(f"  - Successfully processed chunk {chunk_oid}")
+            return fishnet_clipped
+
         print(f"  - Creating fishnet with {total_cells:,} cells...")
-        
+
         # Create the fishnet with 10m cells
         arcpy.management.CreateFishnet(
             out_feature_class=fishnet_output,
@@ -139,12 +191,10 @@ def process_coastline_chunk(chunk_oid):
         fishnet_clipped = f"Fishnet_Clipped_Chunk_{chunk_oid}"
         arcpy.analysis.Clip(fishnet_output, chunk_layer, fishnet_clipped)
         
-        # Add chunk ID to the fishnet
+        # Add chunk ID to the fishnet - one bulk UPDATE inside the
+        # geodatabase engine instead of a per-row UpdateCursor commit
         arcpy.management.AddField(fishnet_clipped, "CHUNK_ID", "LONG")
-        with arcpy.da.UpdateCursor(fishnet_clipped, ["CHUNK_ID"]) as cursor:
-            for row in cursor:
-                row[0] = chunk_oid
-                cursor.updateRow(row)
+        arcpy.management.CalculateField(fishnet_clipped, "CHUNK_ID", str(chunk_oid), "PYTHON3")
         
         # Clean up intermediate files
         arcpy.management.Delete(fishnet_output)
@@ -1,11 +1,17 @@
 import arcpy
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyogrio
 
 # Set up workspace
 main_workspace = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Aus Coast Map.gdb"
 arcpy.env.workspace = main_workspace
 arcpy.env.overwriteOutput = True
 
+need_shp = False  # shapefile export is slow and caps out at 2GB - off by default
+
 def merge_existing_fishnets():
     """Merge all existing fishnet results from previous run"""
     try:
@@ -34,29 +40,45 @@ def merge_existing_fishnets():
         if len(fishnet_layers) > 5:
             print(f"  ... and {len(fishnet_layers) - 5} more")
         
-        # Merge all layers
+        # Merge all layers - read each FC concurrently (pyogrio drops the
+        # GIL during GDAL reads), concat the Arrow-backed frames in memory,
+        # and write the result once, instead of arcpy's Merge opening every
+        # FC and copying records one at a time
         merged_output = "Australia_Coastal_Fishnet_10m_Suburbs"
         print(f"\nMerging into: {merged_output}")
-        
-        arcpy.management.Merge(fishnet_layers, merged_output)
-        
-        # Verify the merge
-        result = arcpy.management.GetCount(merged_output)
-        total_features = int(result[0])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            # OpenFileGDB only opens the .gdb itself - feature classes are
+            # addressed as layers, not sub-paths
+            dfs = list(pool.map(
+                lambda fc: pyogrio.read_dataframe(main_workspace, layer=fc,
+                                                  use_arrow=True),
+                fishnet_layers))
+        merged = pd.concat(dfs, ignore_index=True)
+        pyogrio.write_dataframe(merged, main_workspace, layer=merged_output,
+                                driver="OpenFileGDB")
+
+        total_features = len(merged)
         print(f"Successfully merged {len(fishnet_layers)} layers")
         print(f"Total features in merged dataset: {total_features:,}")
         
-        # Export to shapefile
+        # Export to GeoParquet - per-record shapefile writes take forever at
+        # this cell count and .shp can't hold >2GB anyway
         try:
             output_folder = r"C:\Users\RebeccaStolper\Documents\ArcGIS\Projects\Aus Coast Map\Output"
             if not os.path.exists(output_folder):
                 os.makedirs(output_folder)
-                
-            shapefile_path = os.path.join(output_folder, f"{merged_output}.shp")
-            arcpy.conversion.FeatureClassToShapefile(merged_output, output_folder)
-            print(f"Also exported to shapefile: {shapefile_path}")
+
+            parquet_path = os.path.join(output_folder, f"{merged_output}.parquet")
+            merged.to_parquet(parquet_path, compression="zstd", row_group_size=128_000)
+            print(f"Also exported to GeoParquet: {parquet_path}")
+
+            if need_shp:
+                shapefile_path = os.path.join(output_folder, f"{merged_output}.shp")
+                arcpy.conversion.FeatureClassToShapefile(merged_output, output_folder)
+                print(f"Also exported to shapefile: {shapefile_path}")
         except Exception as e:
-            print(f"Warning: Could not export to shapefile: {str(e)}")
+            print(f"Warning: Could not export merged dataset: {str(e)}")
         
         print(f"\nMerged layer location: {os.path.join(main_workspace, merged_output)}")
         
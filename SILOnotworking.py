@@ -1,6 +1,55 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
 import requests
+import requests_cache
 import pandas as pd
-from io import StringIO
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+# File-backed HTTP cache: repeat calls for the same station/date range are a
+# local sqlite read instead of a full re-download, and cache_control lets the
+# server answer 304 via ETag/Last-Modified for entries past the 24h expiry
+
+def _cacheable(response):
+    """Reject SILO's 200-status error pages before they reach the cache.
+
+    The API reports failures (bad/missing parameters) with HTTP 200, so
+    without this filter a bad request would be stored and replayed for
+    24h. Same standard as the memoized fetch in SILOscript.
+    """
+    head = response.content[:512]
+    return not (b"Sorry" in head or b"Error" in head
+                or b"need variables for json or csv format" in head)
+
+session = requests_cache.CachedSession('silo_cache', backend='sqlite',
+                                       expire_after=24 * 3600,
+                                       cache_control=True,
+                                       filter_fn=_cacheable)
+
+# Module-level constants - pointdata used to rebuild this dict on every call
+_UNIT_DEFS = {
+    'daily_rain': 'mm',
+    'max_temp': 'Celsius',
+    'min_temp': 'Celsius',
+    'vp': 'hPa',
+    'vp_deficit': 'hPa',
+    'evap_pan': 'mm',
+    'evap_syn': 'mm',
+    'evap_comb': 'mm',
+    'evap_morton_lake': 'mm',
+    'radiation': 'MJm-2',
+    'rh_tmax': '%',
+    'rh_tmin': '%',
+    'et_short_crop': 'mm',
+    'et_tall_crop': 'mm',
+    'et_morton_actual': 'mm',
+    'et_morton_potential': 'mm',
+    'et_morton_wet': 'mm',
+    'mslp': 'hPa',
+}
+_UNIT_SUFFIX = {key: f"_{val}" for key, val in _UNIT_DEFS.items()}
 
 def pointdata(variables,
               username,
@@ -13,31 +62,6 @@ def pointdata(variables,
               units=True,
               output=None):
 
-    import requests
-    import pandas as pd
-    from io import StringIO
-
-    unit_defs = {
-        'daily_rain': 'mm',
-        'max_temp': 'Celsius',
-        'min_temp': 'Celsius',
-        'vp': 'hPa',
-        'vp_deficit': 'hPa',
-        'evap_pan': 'mm',
-        'evap_syn': 'mm',
-        'evap_comb': 'mm',
-        'evap_morton_lake': 'mm',
-        'radiation': 'MJm-2',
-        'rh_tmax': '%',
-        'rh_tmin': '%',
-        'et_short_crop': 'mm',
-        'et_tall_crop': 'mm',
-        'et_morton_actual': 'mm',
-        'et_morton_potential': 'mm',
-        'et_morton_wet': 'mm',
-        'mslp': 'hPa',
-    }
-
     # Validate inputs
     if station is None and (lat is None or lon is None):
         raise ValueError("'lat' and 'lon' must be provided if 'station' is not specified.")
@@ -78,7 +102,7 @@ def pointdata(variables,
         params['lon'] = lon
 
     try:
-        r = requests.get(base_url, params=params, timeout=30)
+        r = session.get(base_url, params=params, timeout=30)
         r.raise_for_status()
         
         text = r.content.decode()
@@ -93,20 +117,23 @@ def pointdata(variables,
             print(text)
             return None
 
-        # Read CSV response
-        df = pd.read_csv(StringIO(text))
+        # Read CSV response - pyarrow's multithreaded CSV scanner parses the
+        # raw bytes directly and handles the date column in the same pass,
+        # so no second pd.to_datetime sweep is needed
+        tbl = pa_csv.read_csv(
+            pa.BufferReader(r.content),
+            convert_options=pa_csv.ConvertOptions(timestamp_parsers=['%Y-%m-%d']))
+        df = tbl.to_pandas(types_mapper=pd.ArrowDtype)
 
         # Rename date column if found
         if 'YYYY-MM-DD' in df.columns:
             df = df.rename(columns={'YYYY-MM-DD': 'date'})
 
-        # Convert date column to datetime
-        df['date'] = pd.to_datetime(df['date'])
         df = df.set_index('date')
 
-        # Append units to column names
+        # Append units to column names (suffixes precomputed at import time)
         if units:
-            labels = {key: f"{key}_{unit_defs[key]}" for key in df.columns if key in unit_defs}
+            labels = {key: key + _UNIT_SUFFIX[key] for key in df.columns if key in _UNIT_SUFFIX}
             df = df.rename(columns=labels)
 
         # Save to file if output path is provided
@@ -119,7 +146,7 @@ def pointdata(variables,
         print(f"Error connecting to SILO API: {e}")
         print(f"Attempted to access URL: {base_url} with params: {params}")
         return None
-    except pd.errors.ParserError as e:
+    except (pd.errors.ParserError, pa.ArrowInvalid) as e:
         print(f"Error parsing CSV data: {e}")
         print("API Response:")
         print(text)
@@ -130,6 +157,57 @@ def pointdata(variables,
         return None
 
 
+async def pointdata_many(stations, variables, username, password=None,
+                         start=None, finish=None, units=True):
+    """Fetch several stations concurrently and concat the results.
+
+    Per-station pulls are latency-bound, not CPU-bound, so multiplexing all
+    the queries over one HTTP/2 connection is a near-linear speedup up to
+    the server's limits. CSV parsing is pushed to a thread pool so Arrow
+    parsing overlaps the remaining downloads.
+    """
+    base_url = 'https://www.longpaddock.qld.gov.au/cgi-bin/silo/PatchedPointDataset.php'
+    params = {
+        'username': username,
+        'format': 'csv',
+        'dataset': 'Official',
+        'variables': ','.join(variables) if isinstance(variables, list) else variables,
+    }
+    if start:
+        params['start'] = start.strftime('%Y%m%d') if hasattr(start, 'strftime') else str(start)
+    if finish:
+        params['finish'] = finish.strftime('%Y%m%d') if hasattr(finish, 'strftime') else str(finish)
+    if password:
+        params['password'] = password
+
+    def parse(content):
+        tbl = pa_csv.read_csv(
+            pa.BufferReader(content),
+            convert_options=pa_csv.ConvertOptions(timestamp_parsers=['%Y-%m-%d']))
+        df = tbl.to_pandas(types_mapper=pd.ArrowDtype)
+        if 'YYYY-MM-DD' in df.columns:
+            df = df.rename(columns={'YYYY-MM-DD': 'date'})
+        df = df.set_index('date')
+        if units:
+            labels = {key: key + _UNIT_SUFFIX[key] for key in df.columns if key in _UNIT_SUFFIX}
+            df = df.rename(columns=labels)
+        return df
+
+    loop = asyncio.get_running_loop()
+    async with httpx.AsyncClient(
+            http2=True, timeout=30,
+            limits=httpx.Limits(max_connections=16)) as client:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            async def fetch(station):
+                r = await client.get(base_url, params=dict(params, station=station))
+                r.raise_for_status()
+                return await loop.run_in_executor(pool, parse, r.content)
+
+            frames = await asyncio.gather(*(fetch(s) for s in stations))
+
+    return pd.concat(frames, keys=stations, names=['station'])
+
+
 # Example using station
 data = pointdata(['daily_rain', 'max_temp'], 
                 'rebecca.stolper@hotmail.com', 
@@ -1,3 +1,86 @@
+import asyncio
+import os
+import urllib.parse
+from io import BytesIO, StringIO
+
+import aiohttp
+import pandas as pd
+import requests
+from joblib import Memory
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared session: keep-alive reuses the TCP+TLS connection across requests
+# when looping over many stations/points (one handshake total instead of one
+# per call), and the adapter retries transient server errors with backoff
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32,
+                       max_retries=Retry(total=5, backoff_factor=0.5,
+                                         status_forcelist=[429, 500, 502, 503, 504]))
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+unit_defs = {
+    'daily_rain': 'mm',
+    'max_temp': 'Celsius',
+    'min_temp': 'Celsius',
+    'vp': 'hPa',
+    'vp_deficit': 'hPa',
+    'evap_pan': 'mm',
+    'evap_syn': 'mm',
+    'evap_comb': 'mm',
+    'evap_morton_lake': 'mm',
+    'radiation': 'MJm-2',
+    'rh_tmax': '%',
+    'rh_tmin': '%',
+    'et_short_crop': 'mm',
+    'et_tall_crop': 'mm',
+    'et_morton_actual': 'mm',
+    'et_morton_potential': 'mm',
+    'et_morton_wet': 'mm',
+    'mslp': 'hPa',
+}
+
+# Historical SILO data never changes, so raw responses are memoized on disk
+# (keyed by the full request URL, which carries every parameter) - re-running
+# a script for the same station/date range is a local read, not a download
+_memory = Memory(os.path.expanduser("~/.cache/silo"), verbose=0)
+
+@_memory.cache
+def _fetch_csv_bytes(url):
+    """Download the raw CSV body for a SILO request URL (disk-memoized).
+
+    HTTP errors and SILO's 200-status error page raise instead of
+    returning, so a failed response is never written to the cache - a
+    cached failure would otherwise poison every later run for that URL.
+    """
+    r = _SESSION.get(url, timeout=(5, 30))
+    r.raise_for_status()
+    content = r.content
+    if b"Sorry" in content[:512] and b"missing essential parameters" in content:
+        raise requests.exceptions.HTTPError(
+            f"SILO returned its error page for {url}")
+    return content
+
+def build_silo_url(username, password=None, start=None, finish=None,
+                   station=None, lat=None, lon=None):
+    """Construct the direct SILO request URL for a station or lat/lon point"""
+    if station is not None:
+        base_url = 'https://www.longpaddock.qld.gov.au/cgi-bin/silo/PatchedPointDataset.php'
+    else:
+        base_url = 'https://www.longpaddock.qld.gov.au/cgi-bin/silo/DataDrillDataset.php'
+
+    url = f"{base_url}?format=csv&dataset=Official&username={urllib.parse.quote(username)}"
+    if password:
+        url += f"&password={urllib.parse.quote(password)}"
+    url += f"&start={start}&finish={finish}"
+    if station is not None:
+        url += f"&station={station}"
+    else:
+        url += f"&lat={lat}&lon={lon}"
+    url += "&comment=api_request"
+    return url
+
 # get data from lat/long or station
 def pointdata_direct_url(variables,
                        username,
@@ -8,35 +91,13 @@ def pointdata_direct_url(variables,
                        lat=None,
                        lon=None,
                        units=True,
-                       output=None):
+                       output=None,
+                       session=None,
+                       force_refresh=False):
     """
     Request data from SILO API using direct URL construction instead of params dictionary.
     """
-    import requests
-    import pandas as pd
-    from io import StringIO
-    import urllib.parse
-
-    unit_defs = {
-        'daily_rain': 'mm',
-        'max_temp': 'Celsius',
-        'min_temp': 'Celsius',
-        'vp': 'hPa',
-        'vp_deficit': 'hPa',
-        'evap_pan': 'mm',
-        'evap_syn': 'mm',
-        'evap_comb': 'mm',
-        'evap_morton_lake': 'mm',
-        'radiation': 'MJm-2',
-        'rh_tmax': '%',
-        'rh_tmin': '%',
-        'et_short_crop': 'mm',
-        'et_tall_crop': 'mm',
-        'et_morton_actual': 'mm',
-        'et_morton_potential': 'mm',
-        'et_morton_wet': 'mm',
-        'mslp': 'hPa',
-    }
+    session = session or _SESSION
 
     # Validate inputs
     if station is None and (lat is None or lon is None):
@@ -45,69 +106,55 @@ def pointdata_direct_url(variables,
     if start is None or finish is None:
         raise ValueError("'start' and 'finish' dates are required")
 
-    # Determine base URL
-    if station is not None:
-        base_url = 'https://www.longpaddock.qld.gov.au/cgi-bin/silo/PatchedPointDataset.php'
-    else:
-        base_url = 'https://www.longpaddock.qld.gov.au/cgi-bin/silo/DataDrillDataset.php'
-    
     # Construct URL manually
-    url = f"{base_url}?format=csv&dataset=Official&username={urllib.parse.quote(username)}"
-    
-    if password:
-        url += f"&password={urllib.parse.quote(password)}"
-    
-    url += f"&start={start}&finish={finish}"
-    
-    if station is not None:
-        url += f"&station={station}"
-    else:
-        url += f"&lat={lat}&lon={lon}"
+    url = build_silo_url(username, password, start, finish, station, lat, lon)
 
-    # Add a comment parameter like in your sample URL
-    url += "&comment=api_request"
-    
-    print("Requesting URL (sensitive info redacted):", 
+    print("Requesting URL (sensitive info redacted):",
           url.replace(username, "USERNAME").replace(password if password else "", "PASSWORD"))
     
     try:
-        r = requests.get(url, timeout=30)
-        
-        # Print response status
-        print(f"Response status code: {r.status_code}")
-        
-        text = r.content.decode()
-        
-        # Check for error response
-        if "Sorry" in text and "missing essential parameters" in text:
+        # The memoized path only applies to the shared session - a caller
+        # injecting its own session (or passing force_refresh) goes straight
+        # to the network
+        if force_refresh or session is not _SESSION:
+            r = session.get(url, timeout=(5, 30))
+            print(f"Response status code: {r.status_code}")
+            content = r.content
+        else:
+            content = _fetch_csv_bytes(url)
+
+        # Probe only the head for the API's error page rather than decoding
+        # the whole payload; the C parser then consumes the bytes directly,
+        # so the CSV is held once in memory instead of bytes + text copies
+        if b"Sorry" in content[:512] and b"missing essential parameters" in content:
             print("API Error Response:")
-            print(text)
+            print(content.decode())
             return None
-        
+
         print("First 200 characters of response:")
-        print(text[:200])
-        
+        print(content[:200].decode(errors="replace"))
+
         # Try to parse CSV data
         try:
-            # First, read the CSV without parsing dates
-            df = pd.read_csv(StringIO(text))
-            
+            # Declared dtypes skip pandas' type-inference re-scan, float32 is
+            # plenty of precision for weather variables at half the memory,
+            # and parsing the date column inside the C parser drops the
+            # separate pd.to_datetime pass
+            dtypes = {v: 'float32' for v in unit_defs}
+            df = pd.read_csv(BytesIO(content), dtype=dtypes,
+                             parse_dates=['YYYY-MM-DD'], date_format='%Y-%m-%d')
+
             # Rename the date column from 'YYYY-MM-DD' to 'date'
             if 'YYYY-MM-DD' in df.columns:
                 df = df.rename(columns={'YYYY-MM-DD': 'date'})
-            
-            # Now parse the date column
-            df['date'] = pd.to_datetime(df['date'])
-            
+
             # Set date as index
             df = df.set_index('date')
             
-            # Add units to columns names
+            # Add units to column names - set intersection runs in C, vs the
+            # old loop probing df.columns (a linear scan) once per unit key
             if units:
-                labels = {}
-                for key, val in unit_defs.items():
-                    if key in df.columns:
-                        labels[key] = '{}_{}'.format(key, val)
+                labels = {k: f"{k}_{unit_defs[k]}" for k in unit_defs.keys() & set(df.columns)}
                 df = df.rename(columns=labels)
 
             # Write to csv
@@ -120,7 +167,7 @@ def pointdata_direct_url(variables,
         except Exception as parse_err:
             print(f"CSV parsing error: {parse_err}")
             print("First 500 characters of response:")
-            print(text[:500])
+            print(content[:500].decode(errors="replace"))
             return None
         
     except requests.exceptions.RequestException as e:
@@ -131,6 +178,52 @@ def pointdata_direct_url(variables,
         print(f"Unexpected error: {type(e).__name__}: {e}")
         return None
 
+async def pointdata_async(points, username, password=None, start=None,
+                          finish=None, max_concurrency=64):
+    """Fetch many SILO points concurrently on one event loop.
+
+    Each point is a dict with either 'station' or 'lat'/'lon' keys. The
+    pull is entirely I/O-bound, so a bounded pool of concurrent requests
+    (64 overall, 8 per host) gets near-linear speedup up to the server's
+    rate limit. 429/5xx responses back off exponentially, and CSV parsing
+    runs in the default executor so it never blocks the loop.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+
+    def parse(text):
+        df = pd.read_csv(StringIO(text))
+        if 'YYYY-MM-DD' in df.columns:
+            df = df.rename(columns={'YYYY-MM-DD': 'date'})
+        df['date'] = pd.to_datetime(df['date'])
+        return df.set_index('date')
+
+    connector = aiohttp.TCPConnector(limit_per_host=8, limit=64)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def fetch(point):
+            url = build_silo_url(username, password, start, finish,
+                                 point.get('station'),
+                                 point.get('lat'), point.get('lon'))
+            async with sem:
+                for attempt in range(5):
+                    async with session.get(url) as r:
+                        if r.status in (429, 500, 502, 503, 504):
+                            await asyncio.sleep(2 ** attempt)
+                            continue
+                        r.raise_for_status()
+                        text = await r.text()
+                        break
+                else:
+                    # All retries drew a retryable status - fail loudly
+                    # instead of falling through with nothing fetched
+                    raise RuntimeError(
+                        f"SILO request failed after 5 attempts "
+                        f"(last status {r.status})")
+            return await loop.run_in_executor(None, parse, text)
+
+        return await asyncio.gather(*(fetch(p) for p in points))
+
+
 # Call the function
 result = pointdata_direct_url(
     variables=['daily_rain', 'max_temp', 'min_temp'],
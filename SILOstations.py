@@ -1,5 +1,7 @@
+import os
 import urllib.request
 import urllib.parse
+import orjson
 import pandas as pd
 import requests
 
@@ -11,15 +13,47 @@ params = {
     "bbox": "-44,112,-10,154",  # Bounding box for Australia
 }
 
-# Make the GET request
-response = requests.get(base_url, params=params)
+cache_path = os.path.expanduser("~/.cache/silo_stations.json")
+
+def get_with_etag_cache(url, params=None):
+    """GET with a conditional request validated against the on-disk copy.
+
+    Station metadata rarely changes, so the previous body is stored with
+    its ETag/Last-Modified headers and sent back as If-None-Match /
+    If-Modified-Since. An unchanged response is a bodyless 304 and the
+    cached bytes are reused - no download, nothing new to parse.
+    """
+    cached = None
+    headers = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            cached = orjson.loads(f.read())
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = requests.get(url, params=params, headers=headers)
+    if r.status_code == 304 and cached:
+        return 200, bytes.fromhex(cached["body"])
+    if r.status_code == 200:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "wb") as f:
+            f.write(orjson.dumps({"etag": r.headers.get("ETag"),
+                                  "last_modified": r.headers.get("Last-Modified"),
+                                  "body": r.content.hex()}))
+    return r.status_code, r.content
+
+# Make the GET request (served from the cache when the server says 304)
+status_code, content = get_with_etag_cache(base_url, params)
 
 # Check for successful response
-if response.status_code == 200:
-    station_data = response.json()  # Parse JSON response
-    
-    # Convert to a pandas DataFrame for easy handling
-    stations_df = pd.DataFrame(station_data['stations'])  # Adjust key based on actual API response
+if status_code == 200:
+    # orjson parses the raw bytes several times faster than response.json(),
+    # and json_normalize flattens any nested keys while building the frame
+    station_data = orjson.loads(content)
+
+    stations_df = pd.json_normalize(station_data['stations'])  # Adjust key based on actual API response
     print(stations_df.head())  # Print the first few rows
 else:
-    print(f"Error: {response.status_code}, {response.text}")
\ No newline at end of file
+    print(f"Error: {status_code}, {content.decode(errors='replace')}")
\ No newline at end of file
@@ -1,13 +1,23 @@
+import asyncio
+
 import cdsapi
+import numexpr as ne
 import xarray as xr
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
+from scipy.spatial import cKDTree
 
 # === CONFIG ===
 years = list(range(2005, 2025))
 point_file = "all_weather_data.csv"
 batch_size = 100  # Adjust as needed
+# Persist each year's daily-mean grid to zarr and extract from that on
+# later runs - worth turning on when the GPS point file keeps changing,
+# since the hourly->daily reduction then only ever runs once per year
+cache_daily_zarr = False
 output_dir = Path("era5_daily_data_batched")
 output_dir.mkdir(exist_ok=True)
 
@@ -26,79 +36,207 @@ variables = [
 gps_df = pd.read_csv(point_file).reset_index(drop=True)
 gps_points = list(zip(gps_df["latitude"], gps_df["longitude"]))
 
+# KDTree over the ERA5 grid, built on first use and reused for every year
+# since the grid never changes between files
+grid_tree = None
+
 # === ERA5 Client ===
-c = cdsapi.Client()
-c.status()
-
-for year in years:
-    out_file = output_dir / f"era5_{year}.nc"
-    if not out_file.exists():
-        print(f"Downloading ERA5 data for {year}...")
-        c.retrieve(
-            "reanalysis-era5-single-levels",
-            {
-                "product_type": "reanalysis",
-                "format": "netcdf",
-                "variable": variables,
-                "year": str(year),
-                "month": [f"{m:02d}" for m in range(1, 13)],
-                "day": [f"{d:02d}" for d in range(1, 32)],
-                "time": [f"{h:02d}:00" for h in range(24)],
-                "area": [-10, 110, -45, 155],
-            },
-            str(out_file)
-        )
+# Created lazily and shared by every retrieve: runs with all files already
+# on disk pay no client construction or status round-trip, and the one
+# underlying requests.Session keeps connections alive across jobs
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = cdsapi.Client()
+    return _client
+
+# Half-year requests sit in the CDS queue as two smaller jobs rather than
+# one big one - shorter individual waits, and both halves can queue at once
+half_months = [
+    [f"{m:02d}" for m in range(1, 7)],
+    [f"{m:02d}" for m in range(7, 13)],
+]
+
+def retrieve_half(year, half, months, out_file):
+    print(f"Downloading ERA5 data for {year} h{half}...")
+    get_client().retrieve(
+        "reanalysis-era5-single-levels",
+        {
+            "product_type": "reanalysis",
+            "format": "netcdf",
+            "variable": variables,
+            "year": str(year),
+            "month": months,
+            "day": [f"{d:02d}" for d in range(1, 32)],
+            "time": [f"{h:02d}:00" for h in range(24)],
+            "area": [-10, 110, -45, 155],
+        },
+        str(out_file)
+    )
+
+async def download_year(year, sem, loop):
+    """Fetch one year's netCDF halves, waiting in the CDS queue concurrently.
+
+    Most of the wall time per retrieve is spent queued server-side, so
+    overlapping the waits (bounded by the semaphore to stay inside the
+    fair-use limits) collapses them instead of serialising them.
+    """
+    # A finished year needs neither its netCDF halves nor a queue slot
+    if (output_dir / f"era5_daily_y{year}.parquet").exists():
+        return year, []
+
+    async def fetch_half(half, months):
+        out_file = output_dir / f"era5_{year}_h{half}.nc"
+        if not out_file.exists():
+            async with sem:
+                await loop.run_in_executor(None, retrieve_half,
+                                           year, half, months, out_file)
+        return out_file
+
+    out_files = await asyncio.gather(
+        *(fetch_half(h, m) for h, m in enumerate(half_months, start=1)))
+    return year, list(out_files)
+
+def process_year(year, out_files):
+    global grid_tree
+
+    # Re-runs skip finished years outright - no netCDF open, no extraction
+    out_path = output_dir / f"era5_daily_y{year}.parquet"
+    if out_path.exists():
+        print(f"Skipping {year} - {out_path} already exists")
+        return
 
     print(f"Processing {year}...")
-    ds = xr.open_dataset(out_file)
-    daily_ds = ds.resample(time="1D").mean()
+    # Spatially chunked lazy open: only the chunks containing requested
+    # cells are ever read from disk, and dask spreads them across cores
+    ds = xr.open_mfdataset(out_files, combine="by_coords",
+                           chunks={"time": 240, "latitude": 90,
+                                   "longitude": 90})
+
+    already_daily = False
+    if cache_daily_zarr:
+        zarr_path = output_dir / f"era5_{year}_daily.zarr"
+        if not zarr_path.exists():
+            print(f"  Caching daily grid to {zarr_path}...")
+            ds.resample(time="1D").mean().chunk(
+                {"time": 365, "latitude": 90, "longitude": 90}
+            ).to_zarr(zarr_path, mode="w-")
+        ds = xr.open_zarr(zarr_path)
+        already_daily = True
+
+    # Resolve nearest grid cells for all points with one C-level batched
+    # KDTree query, instead of letting .sel re-run the nearest-neighbour
+    # search on every call
+    if grid_tree is None:
+        lat2d, lon2d = np.meshgrid(ds.latitude.values,
+                                   ds.longitude.values, indexing="ij")
+        grid_tree = cKDTree(np.c_[lat2d.ravel(), lon2d.ravel()])
+    _, cell_idx = grid_tree.query(np.c_[gps_df["latitude"].to_numpy(),
+                                        gps_df["longitude"].to_numpy()])
+
+    # Stack the hourly dataset; the daily mean is taken per batch AFTER the
+    # point subset, so only the needed cells ever go through the hourly ->
+    # daily reduction instead of the whole Australia grid
+    ds_stack = ds.stack(cell=("latitude", "longitude"))
+
+    # One streamed parquet file per year: each batch table is appended as
+    # its own row group the moment it is ready, so peak memory stays at a
+    # single batch regardless of how many points there are. The stream
+    # goes to a .tmp path first so a crash mid-write never leaves a
+    # half-file that the skip above would treat as done
+    tmp_path = out_path.with_suffix(".parquet.tmp")
+    writer = None
 
     # Loop over batches of points
     for start in range(0, len(gps_points), batch_size):
-        batch = gps_points[start:start+batch_size]
+        batch = gps_df.iloc[start:start+batch_size]
         print(f"  Extracting points {start} to {start + len(batch) - 1}")
 
-        batch_data = []
-
-        for i, (lat, lon) in enumerate(batch, start=start):
-            point_ds = daily_ds.sel(latitude=lat, longitude=lon, method="nearest")
-            df = point_ds.to_dataframe().reset_index()
-
-            df["wind_speed"] = np.sqrt(df["u10"]**2 + df["v10"]**2)
-            df["wind_dir"] = (np.arctan2(df["u10"], df["v10"]) * 180 / np.pi) % 360
-            df["rel_humidity"] = 100 * (
-                np.exp((17.625 * df["d2m"]) / (243.04 + df["d2m"])) /
-                np.exp((17.625 * df["t2m"]) / (243.04 + df["t2m"]))
-            )
-
-            df_out = df[[
-                "time",
-                "significant_height_of_combined_wind_waves_and_swell",
-                "mean_wave_direction",
-                "mean_wave_period",
-                "mean_sea_level_pressure",
-                "t2m", "d2m", "rel_humidity",
-                "wind_speed", "wind_dir"
-            ]].copy()
-
-            df_out.columns = [
-                "date", "wave_height", "wave_dir", "wave_period",
-                "mslp", "temp", "dewpoint", "rel_humidity",
-                "wind_speed", "wind_dir"
-            ]
-            df_out["lat"] = lat
-            df_out["lon"] = lon
-            df_out["point_id"] = i
-
-            batch_data.append(df_out)
-
-        # Combine batch and save to disk
-        batch_df = pd.concat(batch_data, ignore_index=True)
-        out_path = output_dir / f"era5_daily_y{year}_p{start}-{start+len(batch)-1}.parquet"
-        batch_df.to_parquet(out_path, index=False)
-
-        print(f"  ✅ Saved batch to {out_path}")
-        del batch_df, batch_data  # Clear memory
+        # Precomputed integer indices into the stacked grid pull every batch
+        # point in one pass over the dataset
+        point_ids = np.arange(start, start + len(batch), dtype=np.int32)
+        pts = ds_stack.isel(cell=cell_idx[start:start+len(batch)])
+        pts = pts.reset_index("cell", drop=True).rename(cell="point")
+        pts = pts.assign_coords(point=point_ids)
+        # Single compute: the open->stack->isel->resample graph for this
+        # batch runs once in parallel, rather than once per variable when
+        # .values is pulled below
+        if not already_daily:
+            pts = pts.resample(time="1D").mean()
+        pts = pts.compute()
+
+        # Assemble the output as a pyarrow table straight from the raw
+        # arrays - no per-variable pandas columns and no concat copy.
+        # Fortran-order ravel of the (time, point) blocks keeps each
+        # point's timeseries contiguous in the output
+        # float32 is plenty of precision for met/wave variables and halves
+        # both the parquet size and downstream read bandwidth
+        n_time = pts.sizes["time"]
+        arrs = {name: np.asarray(da.values, dtype=np.float32).ravel(order="F")
+                for name, da in pts.data_vars.items()}
+        u10, v10 = arrs["u10"], arrs["v10"]
+        t2m, d2m = arrs["t2m"], arrs["d2m"]
+
+        # Derived variables evaluated in single fused numexpr passes - no
+        # u**2 / v**2 temporaries, and the Magnus ratio is rewritten as one
+        # exp of a difference so only one transcendental call runs per value
+        deg = 180 / np.pi
+        wind_speed = ne.evaluate("sqrt(u*u + v*v)",
+                                 {"u": u10, "v": v10}).astype(np.float32)
+        wind_dir = ne.evaluate("(arctan2(u, v) * deg) % 360",
+                               {"u": u10, "v": v10, "deg": deg}).astype(np.float32)
+        rel_humidity = ne.evaluate(
+            "100 * exp((17.625 * d) / (243.04 + d) - (17.625 * t) / (243.04 + t))",
+            {"d": d2m, "t": t2m}).astype(np.float32)
+
+        tbl = pa.table({
+            "date": np.tile(pts["time"].values, len(batch)),
+            "wave_height": arrs["significant_height_of_combined_wind_waves_and_swell"],
+            "wave_dir": arrs["mean_wave_direction"],
+            "wave_period": arrs["mean_wave_period"],
+            "mslp": arrs["mean_sea_level_pressure"],
+            "temp": t2m,
+            "dewpoint": d2m,
+            "rel_humidity": rel_humidity,
+            "wind_speed": wind_speed,
+            "wind_dir": wind_dir,
+            # Per-point constants repeat n_time times each - dictionary
+            # encoding stores one entry per point plus small indices,
+            # instead of a full column of duplicated values
+            "point_id": pa.array(np.repeat(point_ids, n_time)).dictionary_encode(),
+            # Requested (not grid-snapped) coordinates per point
+            "lat": pa.array(np.repeat(batch["latitude"].to_numpy(),
+                                      n_time)).dictionary_encode(),
+            "lon": pa.array(np.repeat(batch["longitude"].to_numpy(),
+                                      n_time)).dictionary_encode(),
+        })
+
+        if writer is None:
+            writer = pq.ParquetWriter(tmp_path, tbl.schema,
+                                      compression="zstd", use_dictionary=True)
+        writer.write_table(tbl)
+
+        print(f"  ✅ Appended points {start}-{start+len(batch)-1} to {tmp_path}")
+        del arrs, tbl  # Clear memory
+
+    if writer is not None:
+        writer.close()
+        tmp_path.rename(out_path)  # Atomic: the output appears only complete
+        print(f"  ✅ Saved {out_path}")
+
+async def main():
+    sem = asyncio.Semaphore(4)
+    loop = asyncio.get_running_loop()
+    tasks = [download_year(year, sem, loop) for year in years]
+    # Process each year as soon as its download lands, so the point
+    # extraction overlaps the remaining queue waits
+    for coro in asyncio.as_completed(tasks):
+        year, out_files = await coro
+        process_year(year, out_files)
+
+asyncio.run(main())
 
 print("🎉 All done! Batched output stored in:", output_dir)
 
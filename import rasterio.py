@@ -9,29 +9,39 @@ with rasterio.open("sentinel_bands.tif") as src:
     image = src.read()  # shape: (bands, rows, cols)
     profile = src.profile
 
-# Reshape to (pixels, bands)
+# Reshape to (pixels, bands). The .T alone would leave a non-contiguous
+# view that sklearn silently copies to C-contiguous float64 inside every
+# predict call - do the layout conversion once up front, in float32
+# (sklearn >= 1.1 keeps float32 without upcasting)
 bands, rows, cols = image.shape
-X = image.reshape(bands, -1).T  # shape: (n_pixels, n_bands)
+X = np.ascontiguousarray(image.reshape(bands, -1).T, dtype=np.float32)
 
 # Load training points (must have lat, lon, and class column)
 train_gdf = gpd.read_file("training_samples.geojson")
 train_gdf = train_gdf.to_crs(profile["crs"])  # match raster CRS
 
-# Extract pixel values under each point
-coords = [(pt.x, pt.y) for pt in train_gdf.geometry]
-row_col = [~src.transform * (x, y) for x, y in coords]
-row_col = [(int(r), int(c)) for c, r in row_col]
+# Extract pixel values under each point - rowcol takes the coordinate
+# arrays natively, and one fancy-index gathers every training pixel in a
+# single C-level pass instead of a Python loop per point
+xs = train_gdf.geometry.x.to_numpy()
+ys = train_gdf.geometry.y.to_numpy()
+rows_arr, cols_arr = rasterio.transform.rowcol(profile["transform"], xs, ys)
+rows_arr = np.asarray(rows_arr, dtype=np.intp)
+cols_arr = np.asarray(cols_arr, dtype=np.intp)
 
-train_pixels = [image[:, r, c] for r, c in row_col]
+X_train = image[:, rows_arr, cols_arr].T.astype(np.float32)  # (n_points, n_bands)
 y = train_gdf["class"].values
-X_train = np.array(train_pixels)
 
 from sklearn.ensemble import RandomForestClassifier
 
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
+clf = RandomForestClassifier(n_estimators=100, n_jobs=-1, random_state=42)
 clf.fit(X_train, y)
 
-y_pred = clf.predict(X)
+# Predict in row-tile chunks: RF prediction is embarrassingly parallel
+# (n_jobs=-1 fans out across trees), and chunking caps the intermediate
+# per-tree vote arrays at one tile instead of the whole raster
+chunks = np.array_split(X, max(1, X.shape[0] // 1_000_000))
+y_pred = np.concatenate([clf.predict(chunk) for chunk in chunks])
 classified = y_pred.reshape(rows, cols)
 
 with rasterio.open("classified_white_sand.tif", "w", **profile) as dst: